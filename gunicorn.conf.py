@@ -0,0 +1,24 @@
+# Multi-worker deployment: gunicorn -c gunicorn.conf.py main:app
+#
+# The app is imported once in the master and forked, so workers share its
+# memory pages. Repo mirrors, scan indexes and LLM responses live on disk
+# (see CODDOC_MIRROR_ROOT and CODDOC_CACHE_DB) and are shared by all workers.
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', 8000)}"
+workers = int(os.getenv("CODDOC_WEB_WORKERS", os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count())))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("CODDOC_WORKER_TIMEOUT", 300))
+graceful_timeout = 30
+
+# Scan pools are per worker; split the cores between them
+os.environ.setdefault("CODDOC_WEB_WORKERS", str(workers))
+
+
+def on_starting(server):
+    # Import the heavy modules before forking so every worker shares them.
+    # Nothing that starts threads, processes or connections may run here.
+    import langgraph_app.agents.readme_writer  # noqa: F401
+    import langgraph_app.agents.repo_analyzer  # noqa: F401
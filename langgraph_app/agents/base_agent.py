@@ -1,53 +1,96 @@
-from typing import Dict, Any
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import ChatPromptTemplate
+from typing import Dict, Any, Optional, Sequence, TYPE_CHECKING
+import hashlib
 import os
-from ..tools.gemini_client import GeminiClient
-import time
+from ..tools.llm_router import (
+    DEFAULT_MAX_OUTPUT_TOKENS,
+    DEFAULT_TEMPERATURE,
+    LLMRouter,
+    LLMUnavailable,
+    get_llm_router,
+)
+from ..tools.routing import describe_route, plan_route
+from ..tools.shared_cache import get_shared_cache
+
+if TYPE_CHECKING:
+    from langchain.prompts import ChatPromptTemplate
+
+LLM_CACHE_NAMESPACE = "llm:v2"
+LLM_CACHE_TTL_SECONDS = int(os.getenv("CODDOC_LLM_CACHE_TTL_SECONDS", 24 * 3600))
 
 class BaseAgent:
-    def __init__(self):
-        """Initialize the base agent with Gemini model."""
-        # Get API key from environment
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            raise ValueError("GEMINI_API_KEY environment variable is required")
+    def __init__(self, use_llm: bool = True):
+        """
+        Initialize the base agent with the shared LLM router.
+        
+        Args:
+            use_llm (bool): False for agents that only run local steps (scans,
+                deterministic rendering); no backend is needed then
+        """
+        self.router: Optional[LLMRouter] = get_llm_router() if use_llm else None
         
-        # Initialize direct Gemini client as fallback
-        self.gemini_client = GeminiClient()
+    def invoke_llm(
+        self,
+        prompt: str,
+        max_output_tokens: int = DEFAULT_MAX_OUTPUT_TOKENS,
+        temperature: float = DEFAULT_TEMPERATURE,
+        backends: Optional[Sequence[str]] = None,
+    ) -> str:
+        """
+        Invoke the LLM with hedging and failover, sharing responses across workers.
+        
+        Args:
+            backends (Optional[Sequence[str]]): Backends to use, as chosen by
+                the route; defaults to the router's general-purpose ones
+        
+        Returns:
+            str: The response, or an "Error: ..." message if every backend failed
+        """
+        if self.router is None:
+            raise RuntimeError(f"{self.__class__.__name__} was created without an LLM")
+        backends = list(backends or self.router.backends_for())
+        models = ",".join(f"{name}={self.router.backends[name].model}" for name in backends if name in self.router.backends)
+        cache_key = hashlib.sha256(
+            f"{models}\n{max_output_tokens}\n{temperature}\n{prompt}".encode()
+        ).hexdigest()
+        cache = get_shared_cache()
+        cached = cache.get(LLM_CACHE_NAMESPACE, cache_key)
+        if cached is not None:
+            return cached
         
         try:
-            self.llm = ChatGoogleGenerativeAI(
-                model="gemini-2.5-flash",
-                temperature=0.7,
-                google_api_key=api_key,
-                # Add these parameters to fix serialization issues
-                convert_system_message_to_human=True,
-                verbose=False
+            result = self.router.generate(
+                prompt,
+                max_output_tokens=max_output_tokens,
+                temperature=temperature,
+                backends=backends,
             )
-            self.use_langchain = True
-        except Exception as e:
-            print(f"Warning: LangChain Gemini initialization failed: {e}")
-            print("Falling back to direct Gemini API client")
-            self.use_langchain = False
-        
-    def invoke_llm(self, prompt: str) -> str:
-        """Invoke the LLM with fallback handling."""
-        # Removed delay to speed up processing
+        except LLMUnavailable as e:
+            print(f"LLM invocation failed: {e}")
+            return f"Error: {e}"
+        cache.set(LLM_CACHE_NAMESPACE, cache_key, result.text, ttl=LLM_CACHE_TTL_SECONDS)
+        return result.text
         
-        if self.use_langchain:
-            try:
-                response = self.llm.invoke(prompt)
-                return response.content
-            except Exception as e:
-                print(f"LangChain invocation failed: {e}, falling back to direct API")
-                self.use_langchain = False
+    def llm_options(self, state: Dict[str, Any], max_output_tokens: Optional[int] = None) -> Dict[str, Any]:
+        """invoke_llm() arguments from the route in state, if one was planned."""
+        route = state.get("route")
+        if not route:
+            return {}
+        return {
+            "max_output_tokens": max_output_tokens or route["max_output_tokens"],
+            "temperature": route["temperature"],
+            "backends": route["backends"],
+        }
         
-        # Use direct Gemini client (which has retry logic)
-        return self.gemini_client.generate_content(prompt)
+    def plan_route(self, state: Dict[str, Any], pipeline: Optional[str] = None) -> Dict[str, Any]:
+        """Plan the route for a scanned repository and record it in decisions."""
+        route = plan_route(state, self.router.backends_for, pipeline)
+        state["route"] = route
+        self.log_decision(state, describe_route(route))
+        return route
         
-    def create_prompt(self, template: str) -> ChatPromptTemplate:
+    def create_prompt(self, template: str) -> "ChatPromptTemplate":
         """Create a chat prompt template."""
+        from langchain.prompts import ChatPromptTemplate
         return ChatPromptTemplate.from_template(template)
         
     def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
@@ -1,10 +1,55 @@
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from .base_agent import BaseAgent
+from ..tools.readme_sections import (
+    render_deterministic_sections,
+    render_local_sections,
+    render_overview,
+    render_usage,
+)
+
+# Sections written by the LLM from scan data alone, so they can be
+# generated in parallel with each other without a separate analysis.
+LLM_SECTION_PROMPTS = {
+    "overview": """
+        Write the opening of a README.md for the project "{project_name}" ({repo_url}).
+        
+        Code Outline (top-level symbols, entry points and routes per file):
+        {code_outline}
+        
+        Dependencies:
+        {dependencies}
+        
+        Return ONLY markdown with:
+        - One paragraph describing what the project does and who it is for
+        - A "## Features" section with 4-8 bullet points grounded in the outline
+        - No title heading, no installation or usage instructions
+        - DO NOT wrap in ```markdown or ``` code blocks
+        """,
+    "usage": """
+        Write the "## Usage" section of a README.md for the project "{project_name}" ({repo_url}).
+        
+        Code Outline (top-level symbols, entry points and routes per file):
+        {code_outline}
+        
+        Dependencies and scripts:
+        {dependencies}
+        
+        Return ONLY markdown with:
+        - A "## Usage" heading
+        - How to run the project, based on its entry points, CLI commands, HTTP routes and scripts
+        - Short code blocks with concrete commands or requests
+        - Nothing about installation
+        - DO NOT wrap the whole answer in ```markdown or ``` code blocks
+        """,
+}
+
+# Order of sections in an assembled README.
+SECTION_ORDER = ["overview", "installation", "usage", "tech_stack", "project_structure", "contributing", "license"]
 
 class ReadmeWriterAgent(BaseAgent):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, use_llm: bool = True):
+        super().__init__(use_llm)
         self.prompt_template = """
         Generate a comprehensive README.md for the following project:
         
@@ -76,87 +121,94 @@ class ReadmeWriterAgent(BaseAgent):
             project_purpose=json.dumps(sample_files, indent=2)
         )
         
+        project_name = self.extract_project_name(repo_url)
         try:
-            response = self.invoke_llm(prompt_text)
-            
-            # Clean up the response
-            response = response.strip()
-            
-            # Remove markdown code block wrapping if present
-            if response.startswith('```markdown'):
-                response = response[11:].strip()
-            elif response.startswith('```'):
-                response = response[3:].strip()
-            
-            if response.endswith('```'):
-                response = response[:-3].strip()
+            response = self.clean_markdown(self.invoke_llm(prompt_text, **self.llm_options(state)))
+            # The router reports exhausted quota and failed backends as "Error: ..." text
+            if not response or response.startswith("Error:"):
+                raise RuntimeError(response or "empty response")
             
             # Ensure response starts with a header
             if not response.strip().startswith('#'):
-                project_name = self.extract_project_name(repo_url)
                 response = f"# {project_name}\n\n{response}"
             
+            self.log_decision(state, f"Generated README with {len(response)} characters")
         except Exception as e:
-            # Fallback README if LLM fails
-            project_name = self.extract_project_name(repo_url)
+            # Degrade to the README rendered from the scan alone
+            print(f"README generation failed: {e}")
             response = self.generate_fallback_readme(project_name, state)
+            state["degraded"] = True
+            self.log_decision(state, f"LLM unavailable, generated deterministic README with {len(response)} characters")
         
         # Update state
         state["readme"] = response
         
-        self.log_decision(state, f"Generated README with {len(response)} characters")
-        
         return state
     
+    def clean_markdown(self, response: str) -> str:
+        """Strip whitespace and any code block wrapping from an LLM response."""
+        response = response.strip()
+        
+        # Remove markdown code block wrapping if present
+        if response.startswith('```markdown'):
+            response = response[11:].strip()
+        elif response.startswith('```'):
+            response = response[3:].strip()
+        
+        if response.endswith('```'):
+            response = response[:-3].strip()
+        return response
+    
+    def render_local_sections(self, state: Dict[str, Any]) -> Dict[str, str]:
+        """Render the sections that need no LLM call from scan results."""
+        repo_url = state.get("repo_url", "")
+        return render_local_sections(repo_url, self.extract_project_name(repo_url), state)
+    
+    def generate_section(self, name: str, state: Dict[str, Any]) -> Optional[str]:
+        """
+        Write one LLM_SECTION_PROMPTS section from scan results.
+        
+        Does not modify state, so several sections can be generated from
+        different threads at once. Returns None if the LLM call fails; the
+        caller substitutes fallback_section().
+        """
+        repo_url = state.get("repo_url", "")
+        project_name = self.extract_project_name(repo_url)
+        sample_files = state.get("sample_files", {})
+        prompt_text = LLM_SECTION_PROMPTS[name].format(
+            project_name=project_name,
+            repo_url=repo_url,
+            code_outline="\n".join(f"{path}: {description}" for path, description in sample_files.items()),
+            dependencies=json.dumps(state.get("dependencies", {}), indent=2)
+        )
+        try:
+            response = self.clean_markdown(self.invoke_llm(prompt_text, **self.llm_options(state)))
+            if response and not response.startswith("Error:"):
+                return response
+        except Exception as e:
+            print(f"Section {name} generation failed: {e}")
+        return None
+    
+    def fallback_section(self, name: str, state: Dict[str, Any]) -> str:
+        """Deterministic stand-in for an LLM-written section."""
+        if name == "usage":
+            return render_usage(state)
+        return render_overview(self.extract_project_name(state.get("repo_url", "")), state)
+    
+    def render_fast_readme(self, state: Dict[str, Any]) -> str:
+        """Build a complete README from scan results in state, without the LLM."""
+        return self.generate_fallback_readme(self.extract_project_name(state.get("repo_url", "")), state)
+    
+    def assemble_readme(self, project_name: str, sections: Dict[str, str]) -> str:
+        """Join rendered sections under the project title in SECTION_ORDER."""
+        parts = [f"# {project_name}"]
+        parts += [sections[name].strip() for name in SECTION_ORDER if sections.get(name)]
+        return "\n\n".join(parts) + "\n"
+    
     def generate_fallback_readme(self, project_name: str, state: Dict[str, Any]) -> str:
         """Generate a basic README if LLM fails."""
-        repo_analysis = state.get("repo_analysis", {})
-        dependencies = state.get("dependencies", {})
-        
-        # Extract some basic info
-        languages = repo_analysis.get("languages", ["Unknown"])
-        project_type = repo_analysis.get("project_type", "Application")
-        
-        # Determine installation command
-        install_cmd = "# See project files for installation instructions"
-        if "package.json" in dependencies:
-            install_cmd = "npm install"
-        elif "requirements.txt" in dependencies:
-            install_cmd = "pip install -r requirements.txt"
-        elif "Cargo.toml" in dependencies:
-            install_cmd = "cargo build"
-        elif "go.mod" in dependencies:
-            install_cmd = "go mod tidy && go build"
-        
-        return f"""# {project_name}
-
-## Description
-
-{project_type} written in {', '.join(languages[:3])}.
-
-## Installation
-
-```bash
-{install_cmd}
-```
-
-## Usage
-
-Please refer to the source code for usage instructions.
-
-## Tech Stack
-
-- **Languages**: {', '.join(languages[:5])}
-- **Dependencies**: {len(dependencies)} dependency files found
-
-## Contributing
-
-Contributions are welcome! Please feel free to submit a Pull Request.
-
-## License
-
-Please check the project files for license information.
-"""
+        sections = render_deterministic_sections(state.get("repo_url", ""), project_name, state)
+        return self.assemble_readme(project_name, sections)
         
     def validate_output(self, output: Dict[str, Any]) -> bool:
         """Validate the README generation output."""
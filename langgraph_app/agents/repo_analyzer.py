@@ -2,10 +2,19 @@ import os
 import json
 from typing import Dict, Any, List
 from .base_agent import BaseAgent
+from ..tools.file_sampler import read_sample
+from ..tools.manifests import MANIFEST_PARSERS
+from ..tools.repo_scanner import scan_repository
+from ..tools.symbol_index import entry_point_entries, outline_entries, outline_size, truncate_outline
+
+# Map-reduce splits an outline of up to OUTLINE_CHUNK_CHARS * MAX_OUTLINE_CHUNKS
+# characters into chunks; every other prompt uses its first OUTLINE_CHUNK_CHARS.
+OUTLINE_CHUNK_CHARS = 6000
+MAX_OUTLINE_CHUNKS = 8
 
 class RepoAnalyzerAgent(BaseAgent):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, use_llm: bool = True):
+        super().__init__(use_llm)
         self.prompt_template = """
         Analyze the following repository and provide a comprehensive analysis:
         
@@ -17,8 +26,8 @@ class RepoAnalyzerAgent(BaseAgent):
         Dependencies Found:
         {dependencies}
         
-        Sample Code Files:
-        {sample_files}
+        Code Outline (top-level symbols, entry points and routes per file):
+        {code_outline}
         
         Please provide a comprehensive analysis including:
         1. Project type and main programming languages
@@ -36,190 +45,111 @@ class RepoAnalyzerAgent(BaseAgent):
         - purpose: Brief description of project purpose
         - features: List of key features
         """
+        self.summary_prompt_template = """
+        Summarize this part of the repository {repo_url} for someone writing its README.
         
-    def get_file_extensions(self, repo_path: str) -> Dict[str, int]:
-        """Get count of files by extension."""
-        extensions = {}
-        for root, _, files in os.walk(repo_path):
-            if '/.git/' in root or '/node_modules/' in root or '/__pycache__/' in root:
-                continue
-            for file in files:
-                ext = os.path.splitext(file)[1].lower()
-                if ext:
-                    extensions[ext] = extensions.get(ext, 0) + 1
-        return extensions
-        
-    def find_dependencies(self, repo_path: str) -> Dict[str, Any]:
-        """Find and parse dependency files."""
-        dependencies = {}
-        
-        dependency_files = {
-            'package.json': self.parse_package_json,
-            'requirements.txt': self.parse_requirements_txt,
-            'pom.xml': self.parse_pom_xml,
-            'Cargo.toml': self.parse_cargo_toml,
-            'go.mod': self.parse_go_mod
-        }
-        
-        for filename, parser in dependency_files.items():
-            filepath = os.path.join(repo_path, filename)
-            if os.path.exists(filepath):
-                try:
-                    deps = parser(filepath)
-                    if deps:
-                        dependencies[filename] = deps
-                except Exception as e:
-                    print(f"Error parsing {filename}: {e}")
+        Code Outline (top-level symbols, entry points and routes per file):
+        {code_outline}
         
-        return dependencies
-    
-    def parse_package_json(self, filepath: str) -> Dict[str, Any]:
-        """Parse package.json file."""
-        with open(filepath, 'r') as f:
-            data = json.load(f)
-        return {
-            'dependencies': data.get('dependencies', {}),
-            'devDependencies': data.get('devDependencies', {}),
-            'scripts': data.get('scripts', {})
-        }
-    
-    def parse_requirements_txt(self, filepath: str) -> List[str]:
-        """Parse requirements.txt file."""
-        with open(filepath, 'r') as f:
-            lines = f.readlines()
-        return [line.strip() for line in lines if line.strip() and not line.startswith('#')]
-    
-    def parse_pom_xml(self, filepath: str) -> List[str]:
-        """Parse pom.xml file (basic)."""
-        with open(filepath, 'r') as f:
-            content = f.read()
-        # Simple regex to find artifact IDs
-        import re
-        artifacts = re.findall(r'<artifactId>(.*?)</artifactId>', content)
-        return artifacts
-    
-    def parse_cargo_toml(self, filepath: str) -> List[str]:
-        """Parse Cargo.toml file (basic)."""
-        dependencies = []
-        with open(filepath, 'r') as f:
-            lines = f.readlines()
-        in_deps = False
-        for line in lines:
-            line = line.strip()
-            if line == '[dependencies]':
-                in_deps = True
-            elif line.startswith('[') and in_deps:
-                break
-            elif in_deps and '=' in line:
-                dep = line.split('=')[0].strip()
-                dependencies.append(dep)
-        return dependencies
-    
-    def parse_go_mod(self, filepath: str) -> List[str]:
-        """Parse go.mod file (basic)."""
-        dependencies = []
-        with open(filepath, 'r') as f:
-            content = f.read()
-        lines = content.split('\n')
-        in_require = False
-        for line in lines:
-            line = line.strip()
-            if line.startswith('require ('):
-                in_require = True
-            elif line == ')' and in_require:
-                break
-            elif in_require and line:
-                dep = line.split()[0] if line.split() else ''
-                if dep:
-                    dependencies.append(dep)
-        return dependencies
+        Return 3-6 short bullet points covering the components in this part,
+        what they do, and any entry points, CLI commands or HTTP routes.
+        Return ONLY the bullet points.
+        """
         
     def sample_code_files(self, repo_path: str, max_files: int = 5) -> Dict[str, str]:
-        """Get content from a few important code files."""
-        important_files = []
+        """Get bounded samples from a few important code files."""
         code_extensions = {'.py', '.js', '.ts', '.java', '.cpp', '.go', '.rs', '.rb', '.php'}
         
         # Look for main files first
         priority_files = ['main.py', 'app.py', 'index.js', 'index.ts', 'main.js', 'server.js']
         
-        for priority_file in priority_files:
-            filepath = os.path.join(repo_path, priority_file)
-            if os.path.exists(filepath):
-                important_files.append(filepath)
-        
-        # Add other code files
-        for root, _, files in os.walk(repo_path):
-            if len(important_files) >= max_files:
+        def candidates():
+            for priority_file in priority_files:
+                filepath = os.path.join(repo_path, priority_file)
+                if os.path.isfile(filepath):
+                    yield filepath
+            for root, dirs, files in os.walk(repo_path):
+                dirs[:] = [d for d in dirs if d not in ['.git', 'node_modules', '__pycache__']]
+                for file in files:
+                    if os.path.splitext(file)[1].lower() in code_extensions:
+                        yield os.path.join(root, file)
+        
+        # Read samples as candidates are found, so skipped files (binary,
+        # generated, minified or oversized) don't use up a slot
+        file_contents = {}
+        for filepath in candidates():
+            if len(file_contents) >= max_files:
                 break
-            if '/.git/' in root or '/node_modules/' in root or '/__pycache__/' in root:
+            relative_path = os.path.relpath(filepath, repo_path)
+            if relative_path in file_contents:
                 continue
-            for file in files:
-                if len(important_files) >= max_files:
-                    break
-                ext = os.path.splitext(file)[1].lower()
-                if ext in code_extensions:
-                    filepath = os.path.join(root, file)
-                    if filepath not in important_files:
-                        important_files.append(filepath)
-        
-        # Read file contents
-        file_contents = {}
-        for filepath in important_files[:max_files]:
             try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                # Truncate if too long
-                if len(content) > 1000:
-                    content = content[:1000] + "\n... (truncated)"
-                relative_path = os.path.relpath(filepath, repo_path)
-                file_contents[relative_path] = content
-            except Exception as e:
+                content = read_sample(filepath, head_chars=1000, max_signatures=10)
+            except (OSError, ValueError) as e:
                 print(f"Error reading {filepath}: {e}")
+                continue
+            if content:
+                file_contents[relative_path] = content
         
         return file_contents
         
-    def build_repo_structure(self, repo_path: str) -> Dict[str, Any]:
-        """Build a simplified repository structure."""
-        structure = {"directories": [], "files": []}
+    def scan(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Gather structure, dependencies and a code outline without the LLM."""
+        repo_path = state["repo_path"]
         
-        for root, dirs, files in os.walk(repo_path):
-            # Skip common non-essential directories
-            dirs[:] = [d for d in dirs if d not in ['.git', '__pycache__', 'node_modules', '.env', 'venv']]
-            
-            relative_root = os.path.relpath(root, repo_path)
-            if relative_root != '.':
-                structure["directories"].append(relative_root)
-            
-            for file in files:
-                if not file.startswith('.') and not file.endswith(('.pyc', '.log')):
-                    relative_path = os.path.relpath(os.path.join(root, file), repo_path)
-                    structure["files"].append(relative_path)
+        # Gather all information in one sharded, process-parallel pass
+        scan = scan_repository(repo_path)
+        repo_structure = {"directories": scan["directories"], "files": scan["files"]}
+        dependencies = {
+            filename: scan["manifests"][filename]
+            for filename in MANIFEST_PARSERS
+            if filename in scan["manifests"]
+        }
         
-        return structure
+        # A dense symbol outline carries far more signal per prompt token
+        # than raw file heads; fall back to heads if nothing was indexed
+        symbol_index = scan["symbols"]
+        outline = outline_entries(symbol_index, max_chars=OUTLINE_CHUNK_CHARS * MAX_OUTLINE_CHUNKS)
+        sample_files = truncate_outline(outline, OUTLINE_CHUNK_CHARS)
+        if not sample_files:
+            sample_files = self.sample_code_files(repo_path)
         
-    def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
-        """Process the repository and analyze everything in one go."""
-        # Call parent process to initialize state
-        state = super().process(state)
-        
-        repo_path = state["repo_path"]
-        repo_url = state["repo_url"]
+        # Update state with all the gathered information
+        state["repo_structure"] = repo_structure
+        state["dependencies"] = dependencies
+        state["sample_files"] = sample_files
+        # Kept for outline_chunks(), so map-reduce never scans again
+        state["outline"] = outline
+        state["entry_points"] = entry_point_entries(symbol_index)
+        state["scan_stats"] = {
+            "files": len(scan["files"]),
+            "directories": len(scan["directories"]),
+            "source_files": scan["source_files"],
+            "indexed_files": len(symbol_index),
+            "outline_chars": outline_size(symbol_index),
+            "extensions": scan["extensions"],
+            "manifests": sorted(scan["manifests"]),
+        }
+        return state
         
-        # Gather all information
-        repo_structure = self.build_repo_structure(repo_path)
-        dependencies = self.find_dependencies(repo_path)
-        sample_files = self.sample_code_files(repo_path)
+    def analyze(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Ask the LLM for a structured analysis of an already scanned repository."""
+        repo_structure = state.get("repo_structure", {})
+        dependencies = state.get("dependencies", {})
+        sample_files = state.get("sample_files", {})
+        scan_stats = state.get("scan_stats", {})
+        code_outline = "\n".join(f"{path}: {description}" for path, description in sample_files.items())
         
         # Format for LLM
         prompt_text = self.prompt_template.format(
-            repo_url=repo_url,
+            repo_url=state["repo_url"],
             repo_structure=json.dumps(repo_structure, indent=2),
             dependencies=json.dumps(dependencies, indent=2),
-            sample_files=json.dumps(sample_files, indent=2)
+            code_outline=code_outline
         )
         
         try:
-            response = self.invoke_llm(prompt_text)
+            response = self.invoke_llm(prompt_text, **self.llm_options(state))
             
             # Try to parse as JSON
             try:
@@ -241,7 +171,7 @@ class RepoAnalyzerAgent(BaseAgent):
             # Fallback analysis
             analysis = {
                 "project_type": "Unknown",
-                "languages": list(self.get_file_extensions(repo_path).keys())[:3],
+                "languages": list(scan_stats.get("extensions", {}).keys())[:3],
                 "frameworks": list(dependencies.keys()) if dependencies else [],
                 "components": ["Main application"],
                 "entry_points": ["Source files"],
@@ -250,16 +180,62 @@ class RepoAnalyzerAgent(BaseAgent):
                 "error": str(e)
             }
         
-        # Update state with all the gathered information
-        state["repo_structure"] = repo_structure
-        state["dependencies"] = dependencies
-        state["sample_files"] = sample_files
         state["repo_analysis"] = analysis
         
-        self.log_decision(state, f"Analyzed repository with {len(sample_files)} files")
+        self.log_decision(state, f"Analyzed repository with {scan_stats.get('indexed_files', 0)} indexed files ({len(sample_files)} in outline)")
         
         return state
         
+    def outline_chunks(
+        self,
+        state: Dict[str, Any],
+        chunk_chars: int = OUTLINE_CHUNK_CHARS,
+        max_chunks: int = MAX_OUTLINE_CHUNKS,
+    ) -> List[Dict[str, str]]:
+        """
+        Split the outline kept by scan() into chunks of chunk_chars.
+        
+        Files stay grouped by top-level directory where possible, so each
+        chunk can be summarized on its own (the map step of map-reduce).
+        """
+        outline = truncate_outline(state.get("outline") or state.get("sample_files", {}), chunk_chars * max_chunks)
+        by_area: Dict[str, Dict[str, str]] = {}
+        for path, description in outline.items():
+            by_area.setdefault(path.replace('\\', '/').split('/')[0], {})[path] = description
+        
+        chunks: List[Dict[str, str]] = [{}]
+        used = 0
+        for area in sorted(by_area):
+            for path, description in by_area[area].items():
+                cost = len(path) + len(description) + 2
+                if used + cost > chunk_chars and chunks[-1]:
+                    chunks.append({})
+                    used = 0
+                chunks[-1][path] = description
+                used += cost
+        return [chunk for chunk in chunks if chunk][:max_chunks]
+        
+    def summarize_chunk(self, state: Dict[str, Any], chunk: Dict[str, str]) -> str:
+        """Summarize one outline chunk; falls back to the chunk's file list."""
+        prompt_text = self.summary_prompt_template.format(
+            repo_url=state["repo_url"],
+            code_outline="\n".join(f"{path}: {description}" for path, description in chunk.items())
+        )
+        route = state.get("route") or {}
+        response = self.invoke_llm(prompt_text, **self.llm_options(state, route.get("map_output_tokens")))
+        if not response or response.startswith("Error:"):
+            return "Files: " + ", ".join(list(chunk)[:20])
+        return response.strip()
+        
+    def process(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """Process the repository and analyze everything in one go."""
+        # Call parent process to initialize state
+        state = super().process(state)
+        state = self.scan(state)
+        if "route" not in state:
+            self.plan_route(state, pipeline="sequential")
+        return self.analyze(state)
+        
     def validate_output(self, output: Dict[str, Any]) -> bool:
         """Validate the repository analysis output."""
         required_keys = ["repo_structure", "dependencies", "repo_analysis"]
@@ -1,11 +1,24 @@
-from typing import Dict, Any, List, TypedDict
+from typing import Dict, Any, List, Optional, TypedDict
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
+import asyncio
 import logging
+import os
 import traceback
 from .agents.repo_analyzer import RepoAnalyzerAgent
 from .agents.readme_writer import ReadmeWriterAgent
 from .agents.supervisor_agent import SupervisorAgent
+from .tools.checkpoints import (
+    ThreadConflict,
+    get_run,
+    maybe_garbage_collect,
+    new_thread_id,
+    open_checkpointer,
+    record_run,
+)
+from .tools.deadlines import remaining
+from .tools.git_utils import cleanup_repo, clone_repo
+from .tools.readme_store import normalize_repo_url
+from .tools.workspace import CLONE_TIMEOUT_SECONDS
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -17,15 +30,39 @@ class GraphState(TypedDict):
     repo_structure: Dict[str, Any]
     dependencies: Dict[str, Any]
     sample_files: Dict[str, str]
+    outline: Dict[str, str]
+    entry_points: List[Dict[str, Any]]
+    scan_stats: Dict[str, Any]
+    route: Dict[str, Any]
     repo_analysis: Dict[str, Any]
     readme: str
+    degraded: bool
     log: List[str]
     decisions: List[Dict[str, Any]]
     current_agent: str
     validation: Dict[str, Any]
 
-async def run_langgraph(state: Dict[str, Any]) -> Dict[str, Any]:
-    """Run the simplified LangGraph workflow for README generation."""
+def same_repo(first: str, second: str) -> bool:
+    """Whether two URLs name the same repository."""
+    return normalize_repo_url(first) == normalize_repo_url(second)
+
+async def run_langgraph(state: Dict[str, Any], thread_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run the simplified LangGraph workflow for README generation.
+    
+    Checkpoints are persisted to SQLite after every node. Passing the
+    thread_id of an earlier run that crashed or timed out resumes it from
+    the last completed node instead of starting over; a run that already
+    finished just returns its final state.
+    
+    The clone of the interrupted attempt is usually gone by then, so a
+    resumed run uses state["repo_path"] if it exists, or clones the
+    repository again for its own duration.
+    
+    Raises:
+        ThreadConflict: If thread_id belongs to a run for a repository
+            other than state["repo_url"]
+    """
     
     try:
         logger.info("Initializing simplified workflow with 2 agents...")
@@ -112,26 +149,72 @@ async def run_langgraph(state: Dict[str, Any]) -> Dict[str, Any]:
         logger.info("Setting entry point to repo_analyzer...")
         workflow.set_entry_point("repo_analyzer")
         
-        # Initialize memory saver for state persistence
-        logger.info("Initializing memory saver...")
-        memory_saver = MemorySaver()
-        
-        # Compile the graph with memory management
-        logger.info("Compiling simplified graph...")
-        app = workflow.compile(checkpointer=memory_saver)
+        # Drop checkpoints of old runs before adding new ones. Registry and
+        # GC calls are blocking sqlite3, so they stay off the event loop.
+        await asyncio.to_thread(maybe_garbage_collect)
         
-        # Generate a unique thread ID for this run
-        thread_id = state.get("repo_url", "").replace("/", "_").replace(":", "_").replace(".", "_")
-        logger.info(f"Generated thread ID: {thread_id}")
+        if thread_id is None:
+            thread_id = new_thread_id(state.get("repo_url", ""))
+        logger.info(f"Using thread ID: {thread_id}")
         
-        # Run the workflow with thread configuration
-        logger.info("Starting simplified workflow execution...")
         config = {
             "configurable": {"thread_id": thread_id},
             "recursion_limit": 50  # Much lower limit since we only have 2 agents
         }
-        result = await app.ainvoke(state, config=config)
-        logger.info("Simplified workflow execution completed")
+        
+        previous_run = await asyncio.to_thread(get_run, thread_id)
+        repo_url = state.get("repo_url") or (previous_run or {}).get("repo_url", "")
+        if previous_run and not same_repo(previous_run["repo_url"], repo_url):
+            raise ThreadConflict(f"Thread {thread_id} belongs to another repository")
+        
+        await asyncio.to_thread(record_run, thread_id, repo_url, "running")
+        status = "interrupted"
+        owned_clone = None
+        conflict = False
+        try:
+            async with open_checkpointer() as checkpointer:
+                # Compile the graph with the disk-backed checkpointer
+                logger.info("Compiling simplified graph...")
+                app = workflow.compile(checkpointer=checkpointer)
+                
+                snapshot = await app.aget_state(config)
+                # Checkpoints can outlive their registry entry
+                if snapshot.values and not same_repo(snapshot.values.get("repo_url", ""), repo_url):
+                    conflict = True
+                    raise ThreadConflict(f"Thread {thread_id} belongs to another repository")
+                if snapshot.values and not snapshot.next:
+                    logger.info("Thread already completed, returning stored result")
+                    status = "completed"
+                    result = dict(snapshot.values)
+                    result["thread_id"] = thread_id
+                    return result
+                
+                # None tells LangGraph to continue from the last checkpoint
+                graph_input = None if snapshot.next else state
+                if graph_input is None:
+                    logger.info(f"Resuming workflow at: {list(snapshot.next)}")
+                    checkpointed_path = snapshot.values.get("repo_path")
+                    if not checkpointed_path or not os.path.isdir(checkpointed_path):
+                        repo_path = state.get("repo_path")
+                        if not repo_path or not os.path.isdir(repo_path):
+                            repo_path = await asyncio.to_thread(clone_repo, repo_url, remaining(CLONE_TIMEOUT_SECONDS))
+                            owned_clone = repo_path
+                        # Written as the node that produced the checkpoint,
+                        # so the pending nodes stay the same
+                        as_node = next(iter(snapshot.metadata.get("writes") or {"__start__": None}))
+                        await app.aupdate_state(config, {"repo_path": repo_path}, as_node=as_node)
+                        logger.info(f"Resuming with the repository re-cloned to: {repo_path}")
+                
+                logger.info("Starting simplified workflow execution...")
+                result = await app.ainvoke(graph_input, config=config)
+                status = "completed"
+                logger.info("Simplified workflow execution completed")
+        finally:
+            # On failure the checkpoints are kept so the run can be resumed
+            if not conflict:
+                await asyncio.to_thread(record_run, thread_id, repo_url, status)
+            if owned_clone:
+                cleanup_repo(owned_clone)
         
         # Store the thread ID in the result for future reference
         result["thread_id"] = thread_id
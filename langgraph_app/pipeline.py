@@ -0,0 +1,131 @@
+from typing import Dict, Any
+import asyncio
+import logging
+import time
+from .agents.repo_analyzer import RepoAnalyzerAgent
+from .agents.readme_writer import LLM_SECTION_PROMPTS, ReadmeWriterAgent
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+async def write_sections(
+    state: Dict[str, Any],
+    readme_writer: ReadmeWriterAgent,
+    started: float,
+) -> Dict[str, Any]:
+    """
+    Write a README from an already scanned repository, section by section.
+    
+    The sections that need no model are rendered locally, and the
+    LLM-written sections run in parallel with each other. They are written
+    from the scan alone, so no separate analysis call is made.
+    """
+    sections = readme_writer.render_local_sections(state)
+    local_count = len(sections)
+    
+    llm_sections = {
+        name: asyncio.create_task(asyncio.to_thread(readme_writer.generate_section, name, state))
+        for name in LLM_SECTION_PROMPTS
+    }
+    fallbacks = []
+    for name, task in llm_sections.items():
+        sections[name] = await task
+        if sections[name] is None:
+            sections[name] = readme_writer.fallback_section(name, state)
+            fallbacks.append(name)
+    state["degraded"] = bool(fallbacks)
+    
+    project_name = readme_writer.extract_project_name(state.get("repo_url", ""))
+    state["readme"] = readme_writer.assemble_readme(project_name, sections)
+    state["current_agent"] = "readmewriter"
+    readme_writer.log_decision(
+        state,
+        f"Generated README with {len(state['readme'])} characters "
+        f"({local_count} sections rendered locally, {len(llm_sections)} written in parallel"
+        f"{', ' + ', '.join(fallbacks) + ' from the local fallback' if fallbacks else ''}) "
+        f"in {time.perf_counter() - started:.2f}s"
+    )
+    return state
+
+async def run_pipelined(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generate a README with its sections written in parallel.
+    
+    As soon as the scan finishes, write_sections() starts every section at
+    once. The critical path is the scan plus roughly one model call.
+    """
+    state.setdefault("log", [])
+    state.setdefault("decisions", [])
+    repo_analyzer = RepoAnalyzerAgent()
+    readme_writer = ReadmeWriterAgent()
+    
+    started = time.perf_counter()
+    state = await asyncio.to_thread(repo_analyzer.scan, state)
+    logger.info(f"Scan completed in {time.perf_counter() - started:.2f}s")
+    if "route" not in state:
+        repo_analyzer.plan_route(state, pipeline="section-parallel")
+    return await write_sections(state, readme_writer, started)
+
+async def run_routed(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Scan, then let the routing policy pick the pipeline from the repository's size.
+    
+    - single-shot: one call writes the whole README; no separate analysis
+    - section-parallel: as run_pipelined()
+    - map-reduce: the outline is first summarized in parallel chunks, and
+      the sections are written from those summaries
+    """
+    state.setdefault("log", [])
+    state.setdefault("decisions", [])
+    repo_analyzer = RepoAnalyzerAgent()
+    readme_writer = ReadmeWriterAgent()
+    
+    started = time.perf_counter()
+    state = await asyncio.to_thread(repo_analyzer.scan, state)
+    logger.info(f"Scan completed in {time.perf_counter() - started:.2f}s")
+    route = repo_analyzer.plan_route(state)
+    
+    if route["pipeline"] == "single-shot":
+        return await asyncio.to_thread(readme_writer.process, state)
+    
+    if route["pipeline"] == "map-reduce":
+        chunks = await asyncio.to_thread(repo_analyzer.outline_chunks, state)
+        summaries = await asyncio.gather(*(
+            asyncio.to_thread(repo_analyzer.summarize_chunk, state, chunk) for chunk in chunks
+        ))
+        # The summaries replace the outline in every later prompt
+        state["sample_files"] = {}
+        for i, (chunk, summary) in enumerate(zip(chunks, summaries)):
+            areas = sorted({path.replace('\\', '/').split('/')[0] for path in chunk})
+            state["sample_files"][f"part {i + 1} ({', '.join(areas)})"] = summary
+        repo_analyzer.log_decision(
+            state,
+            f"Summarized {sum(len(chunk) for chunk in chunks)} outlined files in {len(chunks)} parallel chunks "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+    
+    return await write_sections(state, readme_writer, started)
+
+async def run_fast(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generate a README from the scan alone, with no LLM call.
+    
+    Deterministic and typically done in milliseconds once the clone exists:
+    a preview to show while the LLM version is generated, and the mode to
+    fall back to when the model is unavailable. Needs no API key.
+    """
+    state.setdefault("log", [])
+    state.setdefault("decisions", [])
+    repo_analyzer = RepoAnalyzerAgent(use_llm=False)
+    readme_writer = ReadmeWriterAgent(use_llm=False)
+    
+    started = time.perf_counter()
+    state = await asyncio.to_thread(repo_analyzer.scan, state)
+    state["readme"] = readme_writer.render_fast_readme(state)
+    state["current_agent"] = "readmewriter"
+    readme_writer.log_decision(
+        state,
+        f"Generated deterministic README with {len(state['readme'])} characters "
+        f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+    return state
@@ -0,0 +1,140 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+# Requests generating a README at once in this worker process.
+MAX_CONCURRENT_REQUESTS = int(os.getenv("CODDOC_MAX_CONCURRENT_REQUESTS", 4))
+
+# Requests allowed to wait for a slot; more are rejected outright.
+MAX_QUEUED_REQUESTS = int(os.getenv("CODDOC_MAX_QUEUED_REQUESTS", 16))
+
+# Longest a request may wait for a slot.
+MAX_QUEUE_WAIT_SECONDS = float(os.getenv("CODDOC_MAX_QUEUE_WAIT_SECONDS", 30))
+
+# Assumed duration of a request until some have completed.
+INITIAL_SERVICE_SECONDS = float(os.getenv("CODDOC_ADMISSION_INITIAL_SERVICE_SECONDS", 20))
+
+# Weight of the latest request in the moving average of durations.
+SERVICE_TIME_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """Raised when a request is not admitted; retry_after is in seconds."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = max(1, math.ceil(retry_after))
+
+
+class AdmissionController:
+    """
+    Bounded concurrency with a bounded, time-limited FIFO queue.
+
+    Before queueing, a request's wait is estimated from the queue length and
+    the moving average of request durations. If that wait is longer than
+    the queue allows, or would leave too little of the client's deadline to
+    do the work, the request is rejected at once instead of timing out later.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT_REQUESTS,
+        max_queued: int = MAX_QUEUED_REQUESTS,
+        max_wait: float = MAX_QUEUE_WAIT_SECONDS,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.max_wait = max_wait
+        self.running = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.service_seconds = INITIAL_SERVICE_SECONDS
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    def estimated_wait(self) -> float:
+        """Seconds a request arriving now would likely wait for a slot."""
+        if self.running < self.max_concurrent and self.waiting == 0:
+            return 0.0
+        # Each completion frees one slot; a new arrival is behind everyone waiting
+        return (self.waiting + 1) / self.max_concurrent * self.service_seconds
+
+    async def _wait_for_slot(self, deadline_seconds: Optional[float]) -> None:
+        wait_budget = self.max_wait
+        if deadline_seconds is not None:
+            # Leave the request enough of its deadline to actually run
+            wait_budget = min(wait_budget, deadline_seconds - self.service_seconds)
+        estimate = self.estimated_wait()
+        if self.waiting >= self.max_queued or estimate > wait_budget:
+            self.rejected += 1
+            raise Overloaded(
+                f"Server busy: estimated wait {estimate:.0f}s with {self.waiting} queued",
+                retry_after=estimate,
+            )
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=wait_budget)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise Overloaded(
+                f"Server busy: no slot within {wait_budget:.0f}s",
+                retry_after=self.estimated_wait(),
+            )
+        finally:
+            self.waiting -= 1
+
+    @asynccontextmanager
+    async def admit(self, deadline_seconds: Optional[float] = None) -> AsyncIterator[None]:
+        """
+        Hold a slot for the duration of the block.
+
+        Args:
+            deadline_seconds (Optional[float]): Client's total time budget
+
+        Raises:
+            Overloaded: If the queue is full, the estimated or actual wait is
+                too long, or the deadline leaves no time for the work
+        """
+        if self._semaphore.locked() or self.waiting:
+            await self._wait_for_slot(deadline_seconds)
+        else:
+            # A slot is free and nobody is ahead, so this returns at once
+            await self._semaphore.acquire()
+
+        self.running += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+            elapsed = time.monotonic() - started
+            self.service_seconds += SERVICE_TIME_ALPHA * (elapsed - self.service_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "waiting": self.waiting,
+            "max_concurrent": self.max_concurrent,
+            "max_queued": self.max_queued,
+            "rejected": self.rejected,
+            "avg_service_seconds": round(self.service_seconds, 2),
+            "estimated_wait_seconds": round(self.estimated_wait(), 2),
+        }
+
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the admission controller of this worker process."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController()
+        return _controller
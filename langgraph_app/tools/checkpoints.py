@@ -0,0 +1,137 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager, closing
+from typing import Any, AsyncIterator, Dict, Optional
+
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+# SQLite file of the LangGraph checkpointer.
+CHECKPOINT_DB = os.getenv("CODDOC_CHECKPOINT_DB", os.path.join(".coddoc", "checkpoints.sqlite"))
+
+# SQLite file of the run registry. It is kept apart from the checkpoints:
+# the registry is written with blocking sqlite3 calls, which must never
+# wait on a write transaction the checkpointer's aiosqlite connection holds.
+RUNS_DB = os.getenv("CODDOC_RUNS_DB", os.path.join(".coddoc", "runs.sqlite"))
+
+# Runs not updated for this long are garbage-collected with their checkpoints.
+CHECKPOINT_TTL_SECONDS = int(os.getenv("CODDOC_CHECKPOINT_TTL_SECONDS", 7 * 24 * 3600))
+
+# Minimum time between two garbage-collection passes in one process.
+GC_INTERVAL_SECONDS = int(os.getenv("CODDOC_CHECKPOINT_GC_INTERVAL_SECONDS", 3600))
+
+
+class ThreadConflict(ValueError):
+    """Raised when a thread_id belongs to a run for another repository."""
+
+
+_last_gc = 0.0
+_gc_lock = threading.Lock()
+
+
+def _open(path: str) -> sqlite3.Connection:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def _connect() -> sqlite3.Connection:
+    conn = _open(RUNS_DB)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS runs (
+            thread_id TEXT PRIMARY KEY,
+            repo_url TEXT NOT NULL,
+            status TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        )
+        """
+    )
+    return conn
+
+
+def new_thread_id(repo_url: str) -> str:
+    """
+    Generate a unique thread ID for a run.
+
+    The repository name is kept as a readable prefix, but a random suffix
+    ensures concurrent runs for the same repository never share checkpoints.
+    """
+    name = repo_url.rstrip('/').split('/')[-1]
+    if name.endswith('.git'):
+        name = name[:-4]
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_') or "run"
+    return f"{slug[:40]}-{uuid.uuid4().hex[:16]}"
+
+
+def record_run(thread_id: str, repo_url: str, status: str) -> None:
+    """Create or update a run in the registry."""
+    now = time.time()
+    with closing(_connect()) as conn, conn:
+        conn.execute(
+            """
+            INSERT INTO runs (thread_id, repo_url, status, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(thread_id) DO UPDATE SET status = excluded.status, updated_at = excluded.updated_at
+            """,
+            (thread_id, repo_url, status, now, now),
+        )
+
+
+def get_run(thread_id: str) -> Optional[Dict[str, Any]]:
+    """Return the registry entry for a run, or None if it is unknown."""
+    with closing(_connect()) as conn:
+        conn.row_factory = sqlite3.Row
+        row = conn.execute("SELECT * FROM runs WHERE thread_id = ?", (thread_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def garbage_collect(max_age_seconds: int = CHECKPOINT_TTL_SECONDS) -> int:
+    """
+    Delete runs older than max_age_seconds together with their checkpoints.
+
+    Returns:
+        int: Number of runs removed
+    """
+    cutoff = time.time() - max_age_seconds
+    with closing(_connect()) as conn:
+        stale = [row[0] for row in conn.execute("SELECT thread_id FROM runs WHERE updated_at < ?", (cutoff,))]
+    if not stale:
+        return 0
+    # Checkpoints first: a run whose checkpoints outlive it is collected on
+    # the next pass, never the other way round
+    with closing(_open(CHECKPOINT_DB)) as conn, conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table in ("checkpoints", "writes"):
+            if table in tables:
+                conn.executemany(f"DELETE FROM {table} WHERE thread_id = ?", [(t,) for t in stale])
+    with closing(_connect()) as conn, conn:
+        conn.executemany("DELETE FROM runs WHERE thread_id = ?", [(t,) for t in stale])
+    return len(stale)
+
+
+def maybe_garbage_collect() -> None:
+    """Run garbage_collect at most once per GC_INTERVAL_SECONDS."""
+    global _last_gc
+    with _gc_lock:
+        if time.time() - _last_gc < GC_INTERVAL_SECONDS:
+            return
+        _last_gc = time.time()
+    garbage_collect()
+
+
+@asynccontextmanager
+async def open_checkpointer() -> AsyncIterator[AsyncSqliteSaver]:
+    """Open the disk-backed LangGraph checkpointer."""
+    directory = os.path.dirname(CHECKPOINT_DB)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    async with AsyncSqliteSaver.from_conn_string(CHECKPOINT_DB) as saver:
+        yield saver
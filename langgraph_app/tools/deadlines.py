@@ -0,0 +1,44 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+# Monotonic time by which the current request must finish, if it has a
+# deadline. A context variable follows the request into asyncio.to_thread
+# workers, so clone and LLM calls can read it without threading it through
+# every signature.
+_deadline: ContextVar[Optional[float]] = ContextVar("coddoc_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[None]:
+    """Apply a deadline `seconds` from now to everything run inside the block."""
+    if seconds is None:
+        yield
+        return
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining(default: Optional[float] = None) -> Optional[float]:
+    """
+    Seconds left before the current deadline, floored at zero.
+
+    Returns:
+        Optional[float]: `default` when there is no deadline, otherwise the
+        smaller of the time left and `default`
+    """
+    deadline = _deadline.get()
+    if deadline is None:
+        return default
+    left = max(0.0, deadline - time.monotonic())
+    return left if default is None else min(left, default)
+
+
+def expired() -> bool:
+    """Whether the current deadline has passed."""
+    deadline = _deadline.get()
+    return deadline is not None and time.monotonic() >= deadline
@@ -0,0 +1,198 @@
+import codecs
+import mmap
+import os
+import re
+from typing import List, Optional
+
+# Files larger than this are never sampled; they are almost always bundles,
+# data dumps or vendored artifacts rather than hand-written source.
+MAX_SAMPLE_FILE_BYTES = int(os.getenv("CODDOC_MAX_SAMPLE_FILE_BYTES", 1024 * 1024))
+
+# Manifests (package.json, pom.xml, ...) are read whole, but never past this.
+MAX_MANIFEST_BYTES = int(os.getenv("CODDOC_MAX_MANIFEST_BYTES", 512 * 1024))
+
+# How many leading bytes are inspected to classify a file.
+SNIFF_BYTES = 8192
+
+# Above this size, head/tail/signature reads go through mmap instead of read().
+MMAP_THRESHOLD = 64 * 1024
+
+# Upper bound on the bytes scanned when collecting signatures.
+MAX_SIGNATURE_SCAN_BYTES = 256 * 1024
+
+# Generators announce themselves in a banner at the top of the file, so
+# only the first few lines are checked, and only for markers that do not
+# occur in hand-written comments.
+GENERATED_HEADER_LINES = 5
+GENERATED_MARKERS = (
+    re.compile(rb"@generated\b"),
+    # The Go convention, also followed by protoc, sqlc and others
+    re.compile(rb"^\W*Code generated .* DO NOT EDIT\.", re.MULTILINE),
+)
+
+MINIFIED_SUFFIXES = (".min.js", ".min.css", ".bundle.js", ".chunk.js")
+
+SIGNATURE_PATTERN = re.compile(
+    rb"^[ \t]*(?:export\s+)?(?:default\s+)?(?:pub(?:\([^)]*\))?\s+)?(?:public\s+|private\s+|protected\s+)?"
+    rb"(?:async\s+)?(?:static\s+)?(?:abstract\s+)?"
+    rb"(?:def|class|function|func|fn|interface|struct|enum|trait|impl|type)\b[^\n]*",
+    re.MULTILINE,
+)
+
+
+def classify_prefix(prefix: bytes, filename: str = "") -> Optional[str]:
+    """
+    Classify a file from its leading bytes.
+
+    Args:
+        prefix (bytes): The first bytes of the file
+        filename (str): Optional file name, used for suffix checks
+
+    Returns:
+        Optional[str]: "binary", "generated" or "minified", or None if the
+        file looks like ordinary source text
+    """
+    if b"\x00" in prefix:
+        return "binary"
+
+    # Validate UTF-8 without failing on a multi-byte sequence cut at the end
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+    except UnicodeDecodeError:
+        return "binary"
+
+    if filename.lower().endswith(MINIFIED_SUFFIXES):
+        return "minified"
+
+    header = b"\n".join(prefix[:2048].split(b"\n", GENERATED_HEADER_LINES)[:GENERATED_HEADER_LINES])
+    if any(marker.search(header) for marker in GENERATED_MARKERS):
+        return "generated"
+
+    lines = prefix.split(b"\n")
+    # A trailing partial line says nothing about line length unless it is
+    # the whole prefix
+    complete = lines[:-1] if len(lines) > 1 else lines
+    longest = max(len(line) for line in complete)
+    average = sum(len(line) for line in complete) / len(complete)
+    if longest > 2000 or (len(prefix) >= 1024 and average > 500):
+        return "minified"
+
+    return None
+
+
+def _decode(data: bytes) -> str:
+    """Decode a byte slice that may start or end mid-character."""
+    return data.decode("utf-8", errors="ignore")
+
+
+def _extract_signatures(data: bytes, max_signatures: int) -> List[str]:
+    """Collect declaration-looking lines from a byte buffer."""
+    signatures = []
+    for match in SIGNATURE_PATTERN.finditer(data):
+        signatures.append(_decode(match.group(0)).strip()[:200])
+        if len(signatures) >= max_signatures:
+            break
+    return signatures
+
+
+def _skip_partial_line(middle: bytes, before: bytes) -> bytes:
+    """Drop the rest of a line whose start is already in the head."""
+    if not before or before == b"\n":
+        return middle
+    newline = middle.find(b"\n")
+    return middle[newline + 1:] if newline >= 0 else b""
+
+
+def _between(data: bytes, head: str, tail: str) -> bytes:
+    """The bytes of data after the decoded head and before the decoded tail."""
+    start = len(head.encode("utf-8"))
+    end = max(start, len(data) - len(tail.encode("utf-8")))
+    return _skip_partial_line(data[start:end], data[start - 1:start])
+
+
+def read_sample(
+    filepath: str,
+    head_chars: int = 1000,
+    tail_chars: int = 0,
+    max_signatures: int = 0,
+    max_file_bytes: int = MAX_SAMPLE_FILE_BYTES,
+) -> Optional[str]:
+    """
+    Read a bounded sample of a source file.
+
+    Only the head (and optionally the tail and declaration lines from the
+    middle) is read, so memory use is independent of the file size.
+    Binary, generated, minified and oversized files are skipped.
+
+    Args:
+        filepath (str): Path to the file
+        head_chars (int): Number of leading characters to keep
+        tail_chars (int): Number of trailing characters to keep
+        max_signatures (int): Maximum declaration lines to collect from the
+            part of the file between head and tail
+        max_file_bytes (int): Files larger than this are skipped
+
+    Returns:
+        Optional[str]: The sampled text, or None if the file was skipped
+    """
+    size = os.path.getsize(filepath)
+    if size == 0:
+        return ""
+    if size > max_file_bytes:
+        return None
+
+    # UTF-8 is at most 4 bytes per character
+    head_bytes = head_chars * 4
+    tail_bytes = tail_chars * 4
+
+    with open(filepath, "rb") as f:
+        if size <= MMAP_THRESHOLD:
+            data = f.read()
+            if classify_prefix(data[:SNIFF_BYTES], filepath) is not None:
+                return None
+            text = _decode(data)
+            if len(text) <= head_chars + tail_chars:
+                return text
+            head = text[:head_chars]
+            tail = text[-tail_chars:] if tail_chars else ""
+            middle = _between(data, head, tail) if max_signatures else b""
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if classify_prefix(mm[:SNIFF_BYTES], filepath) is not None:
+                    return None
+                head = _decode(mm[:head_bytes])[:head_chars]
+                tail = _decode(mm[max(0, size - tail_bytes):])[-tail_chars:] if tail_chars else ""
+                middle = b""
+                if max_signatures:
+                    start = len(head.encode("utf-8"))
+                    end = min(size - len(tail.encode("utf-8")), start + MAX_SIGNATURE_SCAN_BYTES)
+                    middle = _skip_partial_line(mm[start:max(start, end)], mm[start - 1:start])
+
+    parts = [head, "\n... (truncated)"]
+    signatures = _extract_signatures(middle, max_signatures) if max_signatures else []
+    if signatures:
+        parts.append("\n... signatures:\n" + "\n".join(signatures))
+    if tail:
+        parts.append("\n... tail:\n" + tail)
+    return "".join(parts)
+
+
+def read_text(filepath: str, max_bytes: int = MAX_MANIFEST_BYTES) -> str:
+    """
+    Read a whole text file, refusing files larger than max_bytes.
+
+    Args:
+        filepath (str): Path to the file
+        max_bytes (int): Maximum allowed file size
+
+    Returns:
+        str: The file contents
+
+    Raises:
+        ValueError: If the file exceeds max_bytes
+    """
+    size = os.path.getsize(filepath)
+    if size > max_bytes:
+        raise ValueError(f"{os.path.basename(filepath)} is {size} bytes, larger than the {max_bytes} byte limit")
+    with open(filepath, "r", encoding="utf-8", errors="replace") as f:
+        return f.read(max_bytes)
@@ -1,41 +1,86 @@
-import os
-import tempfile
-from git import Repo
-from typing import Optional
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from .workspace import WorkspaceQuotaExceeded, get_workspace_manager
 
-def clone_repo(repo_url: str) -> str:
+def clone_repo(repo_url: str, timeout: Optional[float] = None) -> str:
     """
-    Clone a git repository to a temporary directory.
+    Clone a git repository into a managed workspace.
     
     Args:
         repo_url (str): The URL of the git repository to clone
+        timeout (Optional[float]): Seconds before the clone is aborted
         
     Returns:
         str: Path to the cloned repository
         
     Raises:
+        WorkspaceQuotaExceeded: If the clone exceeds a disk quota
+        TimeoutError: If the clone takes longer than timeout
         Exception: If cloning fails
     """
+    manager = get_workspace_manager()
+    workspace = manager.allocate()
     try:
-        # Create a temporary directory
-        temp_dir = tempfile.mkdtemp()
-        
-        # Clone the repository
-        Repo.clone_from(repo_url, temp_dir)
-        
-        return temp_dir
+        return manager.clone(repo_url, workspace, timeout=timeout)
+    except (WorkspaceQuotaExceeded, TimeoutError):
+        manager.release(workspace)
+        raise
     except Exception as e:
+        manager.release(workspace)
         raise Exception(f"Failed to clone repository: {str(e)}")
+    except BaseException:
+        # Never leak a half-written clone, even on cancellation
+        manager.release(workspace)
+        raise
 
 def cleanup_repo(repo_path: str) -> None:
     """
-    Clean up the cloned repository directory.
+    Schedule the cloned repository directory for background deletion.
     
     Args:
         repo_path (str): Path to the repository directory
     """
+    get_workspace_manager().release(repo_path)
+
+@contextmanager
+def cloned_repo(repo_url: str, timeout: Optional[float] = None) -> Iterator[str]:
+    """
+    Clone a repository for the duration of a with block.
+    
+    The workspace is released however the block exits, so exceptions
+    raised while processing the clone cannot leak it.
+    """
+    repo_path = clone_repo(repo_url, timeout=timeout)
     try:
-        import shutil
-        shutil.rmtree(repo_path)
-    except Exception as e:
-        print(f"Warning: Failed to cleanup repository: {str(e)}") 
\ No newline at end of file
+        yield repo_path
+    finally:
+        cleanup_repo(repo_path)
+
+def remote_head(repo_url: str, timeout: float = 10) -> Optional[str]:
+    """
+    Return the commit SHA the remote's HEAD points to, without cloning.
+    
+    Returns:
+        Optional[str]: The SHA, or None if the remote can't be queried
+    """
+    from git import Git
+    
+    try:
+        output = Git().execute(
+            ["git", "ls-remote", "--", repo_url, "HEAD"],
+            kill_after_timeout=timeout,
+            env={"GIT_TERMINAL_PROMPT": "0"},
+        )
+    except Exception:
+        return None
+    fields = output.split()
+    return fields[0] if fields else None
+
+def head_commit(repo_path: str) -> Optional[str]:
+    """Return the commit SHA checked out in repo_path, or None."""
+    from git import Repo
+    
+    try:
+        return Repo(repo_path).head.commit.hexsha
+    except Exception:
+        return None
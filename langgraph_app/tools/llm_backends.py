@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from .gemini_client import GeminiClient
+
+# JSON list of backend configs, tried in order; see load_backend_configs.
+BACKENDS_ENV = "CODDOC_LLM_BACKENDS"
+
+DEFAULT_MODEL = "gemini-2.5-flash"
+SMALL_MODEL = "gemini-2.5-flash-lite"
+
+# Per-call timeout unless a backend config sets "timeout".
+DEFAULT_TIMEOUT_SECONDS = float(os.getenv("CODDOC_LLM_TIMEOUT_SECONDS", 30))
+
+
+class LLMBackend:
+    """
+    One configured model endpoint.
+
+    generate() makes a single attempt and raises on any failure; retries,
+    hedging and failover are left to the router.
+    """
+
+    kind = "base"
+
+    def __init__(
+        self,
+        name: str,
+        model: str,
+        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+        tiers: Optional[List[str]] = None,
+    ):
+        self.name = name
+        self.model = model
+        self.timeout = timeout
+        # Repository size tiers this backend serves (see tools/routing.py);
+        # None serves every tier
+        self.tiers = tiers
+
+    def generate(self, prompt: str, max_output_tokens: int, temperature: float, timeout: Optional[float] = None) -> str:
+        raise NotImplementedError("Backends must implement generate()")
+
+    def call_timeout(self, timeout: Optional[float]) -> float:
+        """The backend's timeout, shortened to `timeout` if one is given."""
+        return self.timeout if timeout is None else min(timeout, self.timeout)
+
+    def describe(self) -> Dict[str, Any]:
+        return {"name": self.name, "kind": self.kind, "model": self.model, "tiers": self.tiers}
+
+
+class GeminiBackend(LLMBackend):
+    """Gemini generateContent over REST."""
+
+    kind = "gemini"
+
+    def __init__(self, name: str, model: str = DEFAULT_MODEL, api_key: Optional[str] = None, **kwargs: Any):
+        super().__init__(name, model, **kwargs)
+        self.client = GeminiClient(model=model, api_key=api_key)
+
+    def generate(self, prompt: str, max_output_tokens: int, temperature: float, timeout: Optional[float] = None) -> str:
+        return self.client.generate_once(
+            prompt,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+            timeout=self.call_timeout(timeout),
+        )
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """
+    Any /chat/completions endpoint: OpenAI itself, or a local vLLM,
+    llama.cpp or Ollama server, or scripts/stub_llm_server.py.
+    """
+
+    kind = "openai"
+
+    def __init__(self, name: str, model: str, base_url: str, api_key: Optional[str] = None, **kwargs: Any):
+        super().__init__(name, model, **kwargs)
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+
+    def generate(self, prompt: str, max_output_tokens: int, temperature: float, timeout: Optional[float] = None) -> str:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        response = requests.post(
+            f"{self.base_url}/chat/completions",
+            headers=headers,
+            json={
+                "model": self.model,
+                "messages": [{"role": "user", "content": prompt}],
+                "max_tokens": max_output_tokens,
+                "temperature": temperature,
+            },
+            timeout=self.call_timeout(timeout),
+        )
+        response.raise_for_status()
+        try:
+            return response.json()["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            raise ValueError(f"Unable to parse response from {self.base_url}")
+
+
+class StubBackend(LLMBackend):
+    """
+    In-process fake for tests and load experiments.
+
+    Answers after `latency` seconds (plus up to `jitter` more), fails with
+    probability `failure_rate`, and returns a deterministic text derived
+    from the prompt.
+    """
+
+    kind = "stub"
+
+    def __init__(
+        self,
+        name: str,
+        model: str = "stub",
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        **kwargs: Any,
+    ):
+        super().__init__(name, model, **kwargs)
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+
+    def generate(self, prompt: str, max_output_tokens: int, temperature: float, timeout: Optional[float] = None) -> str:
+        delay = self.latency + random.random() * self.jitter
+        limit = self.call_timeout(timeout)
+        time.sleep(min(delay, limit))
+        if delay > limit:
+            raise TimeoutError(f"{self.name} timed out after {limit}s")
+        if random.random() < self.failure_rate:
+            raise RuntimeError(f"{self.name} failed (simulated)")
+        digest = hashlib.sha256(prompt.encode()).hexdigest()[:12]
+        return f"Stub response {digest} from {self.name}."
+
+
+BACKEND_KINDS: Dict[str, Callable[..., LLMBackend]] = {
+    GeminiBackend.kind: GeminiBackend,
+    OpenAICompatibleBackend.kind: OpenAICompatibleBackend,
+    StubBackend.kind: StubBackend,
+}
+
+
+def load_backend_configs() -> List[Dict[str, Any]]:
+    """
+    Read backend configs from CODDOC_LLM_BACKENDS, e.g.
+
+        [{"name": "flash", "kind": "gemini", "model": "gemini-2.5-flash"},
+         {"name": "local", "kind": "openai", "model": "llama3",
+          "base_url": "http://localhost:11434/v1"}]
+
+    "api_key_env" names the variable holding a backend's key, and "tiers"
+    restricts a backend to some repository size tiers. Without the variable,
+    Gemini backends are configured if GEMINI_API_KEY is set: Flash-Lite
+    first for small repositories, Flash for everything.
+    """
+    raw = os.getenv(BACKENDS_ENV)
+    if raw:
+        configs = json.loads(raw)
+        if not isinstance(configs, list):
+            raise ValueError(f"{BACKENDS_ENV} must be a JSON list")
+        return configs
+    if os.getenv("GEMINI_API_KEY"):
+        return [
+            {"name": "gemini-lite", "kind": "gemini", "model": SMALL_MODEL, "tiers": ["small"]},
+            {"name": "gemini", "kind": "gemini", "model": DEFAULT_MODEL},
+        ]
+    return []
+
+
+def build_backend(config: Dict[str, Any]) -> LLMBackend:
+    """Instantiate one backend from its config."""
+    config = dict(config)
+    kind = config.pop("kind", "gemini")
+    factory = BACKEND_KINDS.get(kind)
+    if factory is None:
+        raise ValueError(f"Unknown LLM backend kind: {kind}")
+    api_key_env = config.pop("api_key_env", None)
+    if api_key_env:
+        config["api_key"] = os.getenv(api_key_env)
+    config.setdefault("name", f"{kind}-{config.get('model', 'default')}")
+    return factory(**config)
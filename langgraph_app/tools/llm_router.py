@@ -0,0 +1,313 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+import requests
+
+from .deadlines import remaining
+from .llm_backends import LLMBackend, build_backend, load_backend_configs
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_OUTPUT_TOKENS = 1024
+DEFAULT_TEMPERATURE = 0.7
+
+# Hedging: if the first request hasn't answered after the backend's p95
+# latency, a second one is sent and whichever answers first wins.
+HEDGING_ENABLED = os.getenv("CODDOC_LLM_HEDGING", "1") != "0"
+HEDGE_MIN_DELAY_SECONDS = float(os.getenv("CODDOC_HEDGE_MIN_DELAY_SECONDS", 0.5))
+# Used until a backend has enough samples for a percentile
+HEDGE_INITIAL_DELAY_SECONDS = float(os.getenv("CODDOC_HEDGE_INITIAL_DELAY_SECONDS", 10))
+HEDGE_PERCENTILE = float(os.getenv("CODDOC_HEDGE_PERCENTILE", 0.95))
+LATENCY_WINDOW = 200
+MIN_LATENCY_SAMPLES = 10
+
+# Circuit breakers: a backend that fails this many times in a row is
+# skipped for the cool-down, then gets a single trial request.
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("CODDOC_BREAKER_FAILURES", 5))
+BREAKER_RESET_SECONDS = float(os.getenv("CODDOC_BREAKER_RESET_SECONDS", 30))
+
+# Threads making backend calls, shared by all requests in the process;
+# losing hedges finish in the background, so leave headroom.
+MAX_CONCURRENT_CALLS = int(os.getenv("CODDOC_LLM_MAX_CONCURRENCY", 32))
+
+
+class LLMUnavailable(RuntimeError):
+    """Raised when no backend produced a response."""
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open after a cool-down."""
+
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD, reset_seconds: float = BREAKER_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now; claims the half-open trial slot."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            # A failed trial re-opens the breaker for another cool-down
+            if self.trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+
+    def record_abandoned(self) -> None:
+        """A call ended by the caller, not the backend: frees the trial slot and counts nothing."""
+        with self._lock:
+            self.trial_in_flight = False
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies."""
+
+    def __init__(self, size: int = LATENCY_WINDOW):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """The given percentile, or None until there are enough samples."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+@dataclass
+class LLMResult:
+    text: str
+    backend: str
+    model: str
+    seconds: float
+    hedged: bool
+
+
+class LLMRouter:
+    """
+    Sends prompts to an ordered list of backends.
+
+    Each call goes to the first backend whose breaker allows it. If it is
+    slower than that backend's p95, a hedge goes to the next allowed backend
+    (or the same one when it is the only one). Failures fail over down the
+    list. Every backend has its own circuit breaker and latency window.
+    """
+
+    def __init__(self, backends: Sequence[LLMBackend], hedging: bool = HEDGING_ENABLED):
+        if not backends:
+            raise ValueError("At least one LLM backend is required")
+        self.backends = {backend.name: backend for backend in backends}
+        self.order = [backend.name for backend in backends]
+        self.breakers = {name: CircuitBreaker() for name in self.order}
+        self.latencies = {name: LatencyTracker() for name in self.order}
+        self.hedging = hedging
+        self._executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_CALLS, thread_name_prefix="llm")
+
+    def backends_for(self, tier: Optional[str] = None) -> List[str]:
+        """
+        Names of the backends serving a size tier, in order; with no tier,
+        the backends not restricted to any. All backends if none match.
+        """
+        names = [
+            name for name in self.order
+            if self.backends[name].tiers is None or (tier is not None and tier in self.backends[name].tiers)
+        ]
+        return names or list(self.order)
+
+    def hedge_delay(self, name: str) -> float:
+        """Seconds to wait on a backend before sending a hedge."""
+        p95 = self.latencies[name].percentile(HEDGE_PERCENTILE)
+        return max(HEDGE_MIN_DELAY_SECONDS, HEDGE_INITIAL_DELAY_SECONDS if p95 is None else p95)
+
+    def _call(
+        self,
+        name: str,
+        prompt: str,
+        max_output_tokens: int,
+        temperature: float,
+        timeout: Optional[float],
+        deadline_bound: bool = False,
+    ) -> str:
+        """
+        Make one backend call and record the outcome.
+
+        deadline_bound says the timeout was shortened to fit the request
+        deadline; a call that times out then says nothing about the backend's
+        health, so it doesn't count towards opening the breaker.
+        """
+        started = time.monotonic()
+        try:
+            text = self.backends[name].generate(prompt, max_output_tokens, temperature, timeout)
+        except Exception as e:
+            timed_out = isinstance(e, (TimeoutError, requests.exceptions.Timeout)) or (
+                timeout is not None and time.monotonic() - started >= timeout
+            )
+            if deadline_bound and timed_out:
+                self.breakers[name].record_abandoned()
+            else:
+                self.breakers[name].record_failure()
+            raise
+        self.breakers[name].record_success()
+        self.latencies[name].add(time.monotonic() - started)
+        return text
+
+    def generate(
+        self,
+        prompt: str,
+        max_output_tokens: int = DEFAULT_MAX_OUTPUT_TOKENS,
+        temperature: float = DEFAULT_TEMPERATURE,
+        backends: Optional[Sequence[str]] = None,
+        timeout: Optional[float] = None,
+    ) -> LLMResult:
+        """
+        Generate a response, hedging slow calls and failing over on errors.
+
+        Calls never outlive the request deadline (see tools/deadlines.py).
+
+        Args:
+            backends (Optional[Sequence[str]]): Backend names to use, in
+                order; defaults to the backends not restricted to a tier
+            timeout (Optional[float]): Per-call timeout, capped by each
+                backend's own
+
+        Raises:
+            LLMUnavailable: If every attempt failed, every breaker was open
+                or the request deadline passed
+        """
+        plan = [name for name in (backends or self.backends_for()) if name in self.backends]
+        # A lone backend still gets a second attempt, as a hedge or a retry
+        max_attempts = max(2, len(plan))
+        started = time.monotonic()
+        launched: Dict[Future, str] = {}
+        pending = set()
+        errors: List[str] = []
+        tried = 0
+        hedged = False
+
+        def launch() -> Optional[str]:
+            # Breakers are consulted only when a call is really about to be
+            # made, so a half-open trial slot is never claimed and left unused
+            nonlocal tried
+            while tried < max_attempts:
+                name = plan[tried % len(plan)]
+                tried += 1
+                if self.breakers[name].allow():
+                    own_timeout = self.backends[name].call_timeout(timeout)
+                    call_timeout = remaining(own_timeout)
+                    future = self._executor.submit(
+                        self._call, name, prompt, max_output_tokens, temperature, call_timeout,
+                        call_timeout < own_timeout,
+                    )
+                    launched[future] = name
+                    pending.add(future)
+                    return name
+                errors.append(f"{name}: circuit open")
+            return None
+
+        if remaining() == 0:
+            raise LLMUnavailable("Request deadline exceeded before the LLM call")
+        if plan:
+            launch()
+        while pending:
+            can_hedge = self.hedging and not hedged and tried < max_attempts
+            delay = self.hedge_delay(launched[next(iter(launched))]) if can_hedge else None
+            left = remaining()
+            if left is not None:
+                delay = left if delay is None else min(delay, left)
+            done, _ = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+            if not done:
+                if remaining() == 0:
+                    # Abandoned calls finish in the background
+                    raise LLMUnavailable("Request deadline exceeded waiting for the LLM")
+                hedged = True
+                name = launch()
+                if name:
+                    logger.info(f"Hedging LLM call to {name} after {delay:.2f}s")
+                continue
+            for future in done:
+                pending.discard(future)
+                name = launched[future]
+                try:
+                    text = future.result()
+                except Exception as e:
+                    errors.append(f"{name}: {e}")
+                    continue
+                return LLMResult(
+                    text=text,
+                    backend=name,
+                    model=self.backends[name].model,
+                    seconds=time.monotonic() - started,
+                    hedged=hedged,
+                )
+            if not pending:
+                launch()
+        raise LLMUnavailable("All LLM backends failed: " + "; ".join(errors))
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Breaker state and recent latency per backend."""
+        return [
+            {
+                **self.backends[name].describe(),
+                "breaker": self.breakers[name].state,
+                "p95_seconds": self.latencies[name].percentile(HEDGE_PERCENTILE),
+            }
+            for name in self.order
+        ]
+
+
+_router: Optional[LLMRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_llm_router() -> LLMRouter:
+    """
+    Return the process-wide router over the configured backends.
+
+    Raises:
+        ValueError: If no backend is configured
+    """
+    global _router
+    with _router_lock:
+        if _router is None:
+            configs = load_backend_configs()
+            if not configs:
+                raise ValueError("GEMINI_API_KEY or CODDOC_LLM_BACKENDS environment variable is required")
+            _router = LLMRouter([build_backend(config) for config in configs])
+        return _router
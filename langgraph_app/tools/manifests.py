@@ -0,0 +1,148 @@
+import configparser
+import json
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+from .file_sampler import read_text
+
+ARTIFACT_PATTERN = re.compile(r'<artifactId>(.*?)</artifactId>')
+
+
+def parse_package_json(filepath: str) -> Dict[str, Any]:
+    """Parse package.json file."""
+    data = json.loads(read_text(filepath))
+    bin_entries = data.get('bin', {})
+    if isinstance(bin_entries, str):
+        bin_entries = {data.get('name', ''): bin_entries}
+    return {
+        'name': data.get('name', ''),
+        'description': data.get('description', ''),
+        'dependencies': data.get('dependencies', {}),
+        'devDependencies': data.get('devDependencies', {}),
+        'scripts': data.get('scripts', {}),
+        'bin': bin_entries
+    }
+
+
+def parse_requirements_txt(filepath: str) -> List[str]:
+    """Parse requirements.txt file."""
+    lines = read_text(filepath).splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.startswith('#')]
+
+
+def parse_pom_xml(filepath: str) -> List[str]:
+    """Parse pom.xml file (basic)."""
+    content = read_text(filepath)
+    # Simple regex to find artifact IDs
+    return ARTIFACT_PATTERN.findall(content)
+
+
+def parse_cargo_toml(filepath: str) -> List[str]:
+    """Parse Cargo.toml file (basic)."""
+    dependencies = []
+    lines = read_text(filepath).splitlines()
+    in_deps = False
+    for line in lines:
+        line = line.strip()
+        if line == '[dependencies]':
+            in_deps = True
+        elif line.startswith('[') and in_deps:
+            break
+        elif in_deps and '=' in line:
+            dep = line.split('=')[0].strip()
+            dependencies.append(dep)
+    return dependencies
+
+
+def parse_go_mod(filepath: str) -> List[str]:
+    """Parse go.mod file (basic)."""
+    dependencies = []
+    lines = read_text(filepath).split('\n')
+    in_require = False
+    for line in lines:
+        line = line.strip()
+        if line.startswith('require ('):
+            in_require = True
+        elif line == ')' and in_require:
+            break
+        elif in_require and line:
+            dep = line.split()[0] if line.split() else ''
+            if dep:
+                dependencies.append(dep)
+    return dependencies
+
+
+def parse_pyproject_toml(filepath: str) -> Dict[str, Any]:
+    """Parse pyproject.toml (PEP 621 and Poetry metadata)."""
+    if tomllib is None:
+        return {}
+    data = tomllib.loads(read_text(filepath))
+    project = data.get('project', {})
+    poetry = data.get('tool', {}).get('poetry', {})
+    dependencies = list(project.get('dependencies', []))
+    dependencies += [name for name in poetry.get('dependencies', {}) if name != 'python']
+    return {
+        'name': project.get('name') or poetry.get('name', ''),
+        'description': project.get('description') or poetry.get('description', ''),
+        'dependencies': dependencies,
+        'scripts': {**poetry.get('scripts', {}), **project.get('scripts', {})}
+    }
+
+
+def parse_setup_cfg(filepath: str) -> Dict[str, Any]:
+    """Parse setup.cfg metadata, install_requires and console_scripts."""
+    parser = configparser.ConfigParser(interpolation=None)
+    parser.read_string(read_text(filepath))
+
+    def lines(section: str, option: str) -> List[str]:
+        raw = parser.get(section, option, fallback='')
+        return [line.strip() for line in raw.splitlines() if line.strip()]
+
+    scripts = {}
+    for line in lines('options.entry_points', 'console_scripts'):
+        name, _, target = line.partition('=')
+        scripts[name.strip()] = target.strip()
+    return {
+        'name': parser.get('metadata', 'name', fallback=''),
+        'description': parser.get('metadata', 'description', fallback=''),
+        'dependencies': lines('options', 'install_requires'),
+        'scripts': scripts
+    }
+
+
+MANIFEST_PARSERS: Dict[str, Callable[[str], Any]] = {
+    'package.json': parse_package_json,
+    'requirements.txt': parse_requirements_txt,
+    'pom.xml': parse_pom_xml,
+    'Cargo.toml': parse_cargo_toml,
+    'go.mod': parse_go_mod,
+    'pyproject.toml': parse_pyproject_toml,
+    'setup.cfg': parse_setup_cfg
+}
+
+
+def parse_manifest(filepath: str) -> Optional[Any]:
+    """
+    Parse a dependency manifest based on its file name.
+
+    Args:
+        filepath (str): Path to the manifest
+
+    Returns:
+        Optional[Any]: Parsed dependencies, or None if the file is not a
+        known manifest, is empty, or fails to parse
+    """
+    parser = MANIFEST_PARSERS.get(os.path.basename(filepath))
+    if parser is None:
+        return None
+    try:
+        return parser(filepath) or None
+    except Exception as e:
+        print(f"Error parsing {filepath}: {e}")
+        return None
@@ -0,0 +1,72 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+# Web worker processes on this host; each one owns a scan pool, so the
+# cores are split between them by default.
+WEB_WORKERS = max(1, int(os.getenv("CODDOC_WEB_WORKERS", os.getenv("WEB_CONCURRENCY", 1))))
+
+# Number of worker processes shared by scanning and symbol indexing.
+MAX_WORKERS = int(os.getenv("CODDOC_SCAN_WORKERS", max(1, (os.cpu_count() or 1) // WEB_WORKERS)))
+
+# "forkserver" avoids forking a process that already runs the event loop and
+# request threads; override with "fork" or "spawn" if needed.
+START_METHOD = os.getenv("CODDOC_POOL_START_METHOD", "forkserver" if os.name == "posix" else "spawn")
+
+# Imported once in the forkserver so each worker starts with them loaded.
+PRELOAD_MODULES = ["langgraph_app.tools.repo_scanner"]
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Return the process pool shared across requests, creating it on first use.
+
+    Returns:
+        ProcessPoolExecutor: The shared pool
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            context = multiprocessing.get_context(START_METHOD)
+            if START_METHOD == "forkserver":
+                context.set_forkserver_preload(PRELOAD_MODULES)
+            _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=context)
+        return _pool
+
+
+def discard_process_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    Drop a pool that has broken, e.g. after a worker was OOM-killed, so the
+    next get_process_pool() starts a fresh one. A no-op if it was already
+    replaced.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def warm_process_pool() -> None:
+    """Start every worker now, so the first scan doesn't pay for process startup."""
+    pool = get_process_pool()
+    for future in [pool.submit(os.getpid) for _ in range(MAX_WORKERS)]:
+        future.result()
+
+
+def shutdown_process_pool() -> None:
+    """Shut down the shared pool, if it was started."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+atexit.register(shutdown_process_pool)
@@ -0,0 +1,336 @@
+import os
+import re
+from typing import Any, Dict, List
+
+# README sections that can be rendered from the scan alone, in the order
+# they appear in the final document.
+LOCAL_SECTIONS = ["installation", "tech_stack", "project_structure", "contributing", "license"]
+
+LANGUAGE_NAMES = {
+    '.py': 'Python',
+    '.js': 'JavaScript',
+    '.jsx': 'JavaScript',
+    '.mjs': 'JavaScript',
+    '.ts': 'TypeScript',
+    '.tsx': 'TypeScript',
+    '.go': 'Go',
+    '.rs': 'Rust',
+    '.java': 'Java',
+    '.kt': 'Kotlin',
+    '.rb': 'Ruby',
+    '.php': 'PHP',
+    '.cs': 'C#',
+    '.cpp': 'C++',
+    '.cc': 'C++',
+    '.c': 'C',
+    '.swift': 'Swift',
+    '.scala': 'Scala',
+    '.sh': 'Shell',
+    '.html': 'HTML',
+    '.css': 'CSS',
+    '.scss': 'SCSS',
+    '.vue': 'Vue',
+    '.svelte': 'Svelte',
+    '.dart': 'Dart',
+}
+
+INSTALL_COMMANDS = {
+    'package.json': "npm install",
+    'requirements.txt': "pip install -r requirements.txt",
+    'pom.xml': "mvn install",
+    'Cargo.toml': "cargo build",
+    'go.mod': "go mod download",
+    'pyproject.toml': "pip install .",
+    'setup.cfg': "pip install .",
+}
+
+# Well-known dependencies worth calling out, by normalized package name.
+FRAMEWORKS = {
+    'fastapi': 'FastAPI',
+    'flask': 'Flask',
+    'django': 'Django',
+    'streamlit': 'Streamlit',
+    'langchain': 'LangChain',
+    'langgraph': 'LangGraph',
+    'torch': 'PyTorch',
+    'tensorflow': 'TensorFlow',
+    'pandas': 'pandas',
+    'click': 'Click',
+    'typer': 'Typer',
+    'express': 'Express',
+    'next': 'Next.js',
+    'react': 'React',
+    'vue': 'Vue',
+    '@angular/core': 'Angular',
+    'svelte': 'Svelte',
+    'electron': 'Electron',
+    'spring-boot-starter-web': 'Spring Boot',
+    'github.com/gin-gonic/gin': 'Gin',
+    'github.com/spf13/cobra': 'Cobra',
+    'actix-web': 'Actix Web',
+    'axum': 'Axum',
+    'tokio': 'Tokio',
+    'clap': 'clap',
+}
+
+# Separates a requirement's name from its version specifier or extras.
+REQUIREMENT_NAME = re.compile(r'^\s*([A-Za-z0-9@/._-]+)')
+
+LICENSE_FILES = ('LICENSE', 'LICENSE.md', 'LICENSE.txt', 'COPYING')
+
+
+def detect_languages(extensions: Dict[str, int], limit: int = 5) -> List[str]:
+    """Languages ordered by file count, from an extension histogram."""
+    counts: Dict[str, int] = {}
+    for ext, count in extensions.items():
+        name = LANGUAGE_NAMES.get(ext)
+        if name:
+            counts[name] = counts.get(name, 0) + count
+    return [name for name, _ in sorted(counts.items(), key=lambda item: -item[1])][:limit]
+
+
+def requirement_name(requirement: str) -> str:
+    """Package name of a requirement string such as "fastapi[all]>=0.100"."""
+    match = REQUIREMENT_NAME.match(str(requirement))
+    return match.group(1) if match else ''
+
+
+def dependency_names(dependencies: Dict[str, Any], limit: int = 12) -> List[str]:
+    """Flatten parsed manifests into a short list of dependency names."""
+    names: List[str] = []
+    for parsed in dependencies.values():
+        if isinstance(parsed, dict):
+            candidates = [requirement_name(dep) for dep in parsed.get('dependencies', [])]
+        else:
+            candidates = [requirement_name(dep) for dep in parsed]
+        for name in candidates:
+            if name and name not in names:
+                names.append(name)
+    return names[:limit]
+
+
+def detect_frameworks(dependencies: Dict[str, Any]) -> List[str]:
+    """Well-known frameworks among every declared dependency."""
+    names = {name.lower() for name in dependency_names(dependencies, limit=10_000)}
+    return [label for name, label in FRAMEWORKS.items() if name in names]
+
+
+def manifest_metadata(dependencies: Dict[str, Any], key: str) -> str:
+    """First non-empty metadata field (name, description) across manifests."""
+    for parsed in dependencies.values():
+        if isinstance(parsed, dict) and parsed.get(key):
+            return str(parsed[key]).strip()
+    return ''
+
+
+def command_line_tools(dependencies: Dict[str, Any]) -> List[str]:
+    """Executables installed by the package: console_scripts and npm bins."""
+    tools: List[str] = []
+    for manifest, parsed in dependencies.items():
+        if not isinstance(parsed, dict):
+            continue
+        # package.json "scripts" are npm run targets, not installed commands
+        names = parsed.get('bin', {}) if manifest == 'package.json' else parsed.get('scripts', {})
+        for name in names:
+            if name and name not in tools:
+                tools.append(name)
+    return tools
+
+
+def run_command(entry_point: Dict[str, Any]) -> str:
+    """Shell command that starts a file detected as a program entry point."""
+    path = entry_point["path"].replace('\\', '/')
+    language = entry_point.get("language")
+    if language == 'python':
+        return f"python {path}"
+    if language in ('javascript', 'typescript'):
+        return f"node {path}" if language == 'javascript' else f"npx ts-node {path}"
+    if language == 'go':
+        directory = os.path.dirname(path)
+        return f"go run ./{directory}" if directory else "go run ."
+    if language == 'rust':
+        return "cargo run" if path.endswith('main.rs') else f"cargo run --bin {os.path.basename(path)[:-3]}"
+    return ''
+
+
+
+def render_installation(repo_url: str, project_name: str, dependencies: Dict[str, Any]) -> str:
+    """Installation steps from the detected manifests."""
+    commands = [f"git clone {repo_url}", f"cd {project_name}"]
+    for manifest, command in INSTALL_COMMANDS.items():
+        if manifest in dependencies and command not in commands:
+            commands.append(command)
+    if len(commands) == 2:
+        commands.append("# See project files for installation instructions")
+    return "## Installation\n\n```bash\n" + "\n".join(commands) + "\n```\n"
+
+
+def render_tech_stack(scan_stats: Dict[str, Any], dependencies: Dict[str, Any]) -> str:
+    """Languages and key dependencies."""
+    lines = ["## Tech Stack", ""]
+    languages = detect_languages(scan_stats.get("extensions", {}))
+    if languages:
+        lines.append(f"- **Languages**: {', '.join(languages)}")
+    frameworks = detect_frameworks(dependencies)
+    if frameworks:
+        lines.append(f"- **Frameworks**: {', '.join(frameworks)}")
+    names = dependency_names(dependencies)
+    if names:
+        lines.append(f"- **Dependencies**: {', '.join(f'`{name}`' for name in names)}")
+    if len(lines) == 2:
+        lines.append("- See project files for details")
+    return "\n".join(lines) + "\n"
+
+
+def render_project_structure(
+    project_name: str,
+    repo_structure: Dict[str, Any],
+    max_depth: int = 2,
+    max_entries: int = 40,
+) -> str:
+    """A directory tree of the top levels of the repository."""
+    tree: Dict[str, Any] = {}
+    paths = [(d, True) for d in repo_structure.get("directories", [])]
+    paths += [(f, False) for f in repo_structure.get("files", [])]
+    for path, is_dir in paths:
+        parts = path.replace('\\', '/').split('/')
+        if len(parts) > max_depth:
+            continue
+        node = tree
+        for i, part in enumerate(parts):
+            last = i == len(parts) - 1
+            key = part + ('/' if (is_dir or not last) else '')
+            node = node.setdefault(key, {})
+
+    lines = [f"{project_name}/"]
+    remaining = [max_entries]
+
+    def walk(node: Dict[str, Any], prefix: str) -> None:
+        # Directories first, then files, each alphabetically
+        keys = sorted(node, key=lambda k: (not k.endswith('/'), k.lower()))
+        for i, key in enumerate(keys):
+            if remaining[0] <= 0:
+                lines.append(f"{prefix}└── ...")
+                return
+            remaining[0] -= 1
+            last = i == len(keys) - 1
+            lines.append(f"{prefix}{'└── ' if last else '├── '}{key}")
+            walk(node[key], prefix + ('    ' if last else '│   '))
+
+    walk(tree, "")
+    return "## Project Structure\n\n```\n" + "\n".join(lines) + "\n```\n"
+
+
+def render_contributing() -> str:
+    return "## Contributing\n\nContributions are welcome! Please feel free to submit a Pull Request.\n"
+
+
+def render_license(repo_structure: Dict[str, Any]) -> str:
+    files = set(repo_structure.get("files", []))
+    for name in LICENSE_FILES:
+        if name in files:
+            return f"## License\n\nSee the [{name}]({name}) file for license information.\n"
+    return "## License\n\nPlease check the project files for license information.\n"
+
+
+def render_overview(project_name: str, state: Dict[str, Any]) -> str:
+    """Description and features inferred from manifests and the symbol index."""
+    dependencies = state.get("dependencies", {})
+    scan_stats = state.get("scan_stats", {})
+    entry_points = state.get("entry_points", [])
+    languages = detect_languages(scan_stats.get("extensions", {}))
+    frameworks = detect_frameworks(dependencies)
+
+    description = manifest_metadata(dependencies, 'description')
+    if not description:
+        written_in = f" written in {', '.join(languages[:3])}" if languages else ""
+        built_with = f", built with {', '.join(frameworks[:3])}" if frameworks else ""
+        description = f"{project_name} is a project{written_in}{built_with}."
+
+    features = []
+    routes = [route for entry in entry_points for route in entry.get("routes", [])]
+    if routes:
+        features.append(f"HTTP API with {len(routes)} route{'s' if len(routes) != 1 else ''}")
+    tools = command_line_tools(dependencies)
+    commands = [command for entry in entry_points for command in entry.get("cli", []) if command != 'argparse']
+    if tools or commands:
+        features.append("Command-line interface (" + ", ".join(f"`{name}`" for name in (tools or commands)[:5]) + ")")
+    for framework in frameworks[:4]:
+        features.append(f"Built on {framework}")
+    if scan_stats.get("source_files"):
+        across = f" across {len(languages)} language{'s' if len(languages) != 1 else ''}" if languages else ""
+        count = scan_stats['source_files']
+        features.append(f"{count} source file{'s' if count != 1 else ''}{across}")
+
+    text = description + "\n"
+    if features:
+        text += "\n## Features\n\n" + "\n".join(f"- {feature}" for feature in features) + "\n"
+    return text
+
+
+def render_usage(state: Dict[str, Any], max_items: int = 10) -> str:
+    """How to run the project: scripts, installed commands, entry points and routes."""
+    dependencies = state.get("dependencies", {})
+    entry_points = state.get("entry_points", [])
+    parts = ["## Usage"]
+
+    package_scripts = dependencies.get('package.json', {}).get('scripts', {}) if isinstance(
+        dependencies.get('package.json'), dict) else {}
+    if package_scripts:
+        commands = [
+            f"npm {name}" if name in ('start', 'test') else f"npm run {name}"
+            for name in list(package_scripts)[:max_items]
+        ]
+        parts.append("### Scripts\n\n```bash\n" + "\n".join(commands) + "\n```")
+
+    tools = command_line_tools(dependencies)
+    if tools:
+        parts.append("### Command-line tools\n\n```bash\n" + "\n".join(f"{name} --help" for name in tools[:max_items]) + "\n```")
+
+    runs = []
+    for entry in entry_points:
+        command = run_command(entry) if entry.get("main") else ''
+        if command and command not in runs:
+            runs.append(command)
+    if runs:
+        parts.append("### Running\n\n```bash\n" + "\n".join(runs[:max_items]) + "\n```")
+
+    routes = [(route, entry["path"]) for entry in entry_points for route in entry.get("routes", [])]
+    if routes:
+        rows = "\n".join(f"| `{route}` | `{path}` |" for route, path in routes[:max_items * 2])
+        more = f"\n\n...and {len(routes) - max_items * 2} more." if len(routes) > max_items * 2 else ""
+        parts.append("### API Routes\n\n| Route | Defined in |\n| --- | --- |\n" + rows + more)
+
+    if len(parts) == 1:
+        parts.append("Please refer to the source code for usage instructions.")
+    return "\n\n".join(parts) + "\n"
+
+
+def render_local_sections(repo_url: str, project_name: str, state: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Render every section in LOCAL_SECTIONS from scan results in state.
+
+    Returns:
+        Dict[str, str]: Markdown per section name
+    """
+    dependencies = state.get("dependencies", {})
+    repo_structure = state.get("repo_structure", {})
+    return {
+        "installation": render_installation(repo_url, project_name, dependencies),
+        "tech_stack": render_tech_stack(state.get("scan_stats", {}), dependencies),
+        "project_structure": render_project_structure(project_name, repo_structure),
+        "contributing": render_contributing(),
+        "license": render_license(repo_structure),
+    }
+
+
+def render_deterministic_sections(repo_url: str, project_name: str, state: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Render every README section from scan results alone, without the LLM.
+
+    Used for fast mode and whenever the LLM is unavailable.
+    """
+    sections = render_local_sections(repo_url, project_name, state)
+    sections["overview"] = render_overview(project_name, state)
+    sections["usage"] = render_usage(state)
+    return sections
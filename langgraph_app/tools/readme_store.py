@@ -0,0 +1,59 @@
+import hashlib
+import os
+from typing import Any, Dict, Optional
+
+from .shared_cache import get_shared_cache
+
+# Bump whenever a change to the pipeline changes the README it produces for
+# the same commit, so earlier results stop matching.
+PIPELINE_VERSION = "2"
+
+README_NAMESPACE = "readme:v1"
+
+# Results are keyed by commit, so they never go stale; this only bounds the
+# size of the store.
+README_TTL_SECONDS = int(os.getenv("CODDOC_README_TTL_SECONDS", 30 * 24 * 3600))
+
+
+def normalize_repo_url(repo_url: str) -> str:
+    """Spelling-insensitive form of a repository URL."""
+    url = repo_url.strip().rstrip('/')
+    if url.endswith('.git'):
+        url = url[:-4]
+    return url.lower()
+
+
+def readme_key(repo_url: str, commit_sha: str, mode: str) -> str:
+    """
+    Content key of a generated README: the same repository, commit,
+    pipeline version and mode always produce the same key.
+    """
+    material = f"{normalize_repo_url(repo_url)}\n{commit_sha}\n{PIPELINE_VERSION}:{mode}"
+    return hashlib.sha256(material.encode()).hexdigest()[:40]
+
+
+def etag_for(key: str) -> str:
+    """Strong ETag for a README key."""
+    return f'"{key}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str, stored: bool) -> bool:
+    """
+    Whether an If-None-Match header matches etag (weak comparison, per RFC 9110).
+
+    Nothing matches a key with no stored copy, not even "*".
+    """
+    if not if_none_match or not stored:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in candidates or etag in [tag[2:] if tag.startswith('W/') else tag for tag in candidates]
+
+
+def get_readme(key: str) -> Optional[Dict[str, Any]]:
+    """Return the stored response for a key, if any."""
+    return get_shared_cache().get(README_NAMESPACE, key)
+
+
+def put_readme(key: str, response: Dict[str, Any]) -> None:
+    """Store a generated response under its key, for every worker."""
+    get_shared_cache().set(README_NAMESPACE, key, response, ttl=README_TTL_SECONDS)
@@ -0,0 +1,268 @@
+import logging
+import os
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from .manifests import MANIFEST_PARSERS, parse_manifest
+from .process_pool import MAX_WORKERS, discard_process_pool, get_process_pool
+from .shared_cache import get_shared_cache
+from .symbol_index import (
+    SKIP_DIRS as INDEX_SKIP_DIRS,
+    get_cached_entries,
+    index_file,
+    language_for,
+    put_cached_entries,
+    tracked_blob_hashes,
+)
+
+logger = logging.getLogger(__name__)
+
+# Namespace of whole-scan results in the shared cache; bump it whenever the
+# shape of a scan changes.
+SCAN_CACHE_NAMESPACE = "scan:v4"
+
+# Directories left out of the structure listing and extension counts.
+STRUCTURE_SKIP_DIRS = {'.git', '__pycache__', 'node_modules', '.env', 'venv'}
+
+# Hard cap on indexed source files per shard.
+MAX_INDEXED_FILES = int(os.getenv("CODDOC_MAX_INDEXED_FILES", 5000))
+
+# Shards are split until there are this many per worker, so one large
+# top-level directory doesn't serialize the whole scan.
+SHARDS_PER_WORKER = 2
+MAX_SHARD_DEPTH = 3
+
+# (relative directory, recursive)
+Shard = Tuple[str, bool]
+
+
+def _listable(filename: str) -> bool:
+    return not filename.startswith('.') and not filename.endswith(('.pyc', '.log'))
+
+
+def _index_skipped(relative_dir: str) -> bool:
+    """True if any component of the path is excluded from symbol indexing."""
+    if relative_dir in ('', '.'):
+        return False
+    return any(part in INDEX_SKIP_DIRS or part.startswith('.') for part in relative_dir.split(os.sep))
+
+
+def _subdirectories(repo_path: str, relative_dir: str) -> List[str]:
+    try:
+        entries = os.scandir(os.path.join(repo_path, relative_dir))
+    except OSError:
+        return []
+    with entries:
+        return sorted(
+            os.path.join(relative_dir, entry.name) if relative_dir else entry.name
+            for entry in entries
+            if entry.is_dir(follow_symlinks=False) and entry.name not in STRUCTURE_SKIP_DIRS
+        )
+
+
+def _in_shard(relative_path: str, shard: Shard) -> bool:
+    relative_dir, recursive = shard
+    parent = os.path.dirname(relative_path)
+    if not recursive:
+        return parent == relative_dir
+    return parent == relative_dir or parent.startswith(relative_dir + os.sep)
+
+
+def plan_shards(repo_path: str, workers: int = MAX_WORKERS) -> List[Shard]:
+    """
+    Split the repository into scan shards by top-level directory.
+
+    The root's own files form a non-recursive shard and every top-level
+    directory a recursive one. While there are too few shards to keep the
+    pool busy, directories are expanded one more level.
+
+    Args:
+        repo_path (str): Path to the repository
+        workers (int): Number of pool workers to plan for
+
+    Returns:
+        List[Shard]: (relative_dir, recursive) pairs covering the tree once
+    """
+    flat: List[Shard] = [('', False)]
+    recursive = [(d, 1) for d in _subdirectories(repo_path, '')]
+    target = workers * SHARDS_PER_WORKER
+
+    while len(flat) + len(recursive) < target:
+        expandable = [item for item in recursive if item[1] < MAX_SHARD_DEPTH]
+        if not expandable:
+            break
+        # Expanding the first candidate keeps the plan deterministic
+        relative_dir, depth = expandable[0]
+        recursive.remove((relative_dir, depth))
+        flat.append((relative_dir, False))
+        recursive.extend((d, depth + 1) for d in _subdirectories(repo_path, relative_dir))
+
+    return flat + [(d, True) for d, _ in recursive]
+
+
+def scan_shard(task: Tuple[str, str, bool, FrozenSet[str]]) -> Dict[str, Any]:
+    """
+    Scan one shard of the repository. Runs inside a worker process.
+
+    Only relative paths, counts and small symbol entries are returned, to
+    keep the cost of shipping results back to the parent low.
+
+    Args:
+        task: (repo_path, relative_dir, recursive, cached_paths) where
+            cached_paths are source files whose symbols the parent already has
+
+    Returns:
+        Dict[str, Any]: Partial scan result for the shard
+    """
+    repo_path, relative_dir, recursive, cached_paths = task
+    result: Dict[str, Any] = {
+        "directories": [],
+        "files": [],
+        "extensions": {},
+        "manifests": {},
+        "symbols": [],
+        "source_files": 0,
+    }
+    extensions = result["extensions"]
+    top = os.path.join(repo_path, relative_dir) if relative_dir else repo_path
+
+    for root, dirs, files in os.walk(top):
+        dirs[:] = sorted(d for d in dirs if d not in STRUCTURE_SKIP_DIRS) if recursive else []
+        relative_root = os.path.relpath(root, repo_path)
+        if relative_root != '.':
+            result["directories"].append(relative_root)
+        index_files = not _index_skipped(relative_root)
+
+        for file in sorted(files):
+            relative_path = file if relative_root == '.' else os.path.join(relative_root, file)
+            ext = os.path.splitext(file)[1].lower()
+            if ext:
+                extensions[ext] = extensions.get(ext, 0) + 1
+            if _listable(file):
+                result["files"].append(relative_path)
+            if file in MANIFEST_PARSERS:
+                parsed = parse_manifest(os.path.join(root, file))
+                if parsed:
+                    result["manifests"][relative_path] = parsed
+            if index_files and language_for(file):
+                result["source_files"] += 1
+                if relative_path in cached_paths:
+                    continue
+                if result["source_files"] > MAX_INDEXED_FILES:
+                    continue
+                _, digest, entry = index_file((relative_path, os.path.join(root, file)))
+                if entry is not None:
+                    result["symbols"].append((relative_path, digest, entry))
+
+    return result
+
+
+def head_tree_hash(repo_path: str) -> Optional[str]:
+    """Return the tree hash of HEAD, or None if repo_path is not a clean git checkout."""
+    from git import Repo
+
+    try:
+        repo = Repo(repo_path)
+        if repo.is_dirty(untracked_files=True):
+            return None
+        return repo.head.commit.tree.hexsha
+    except Exception:
+        return None
+
+
+def map_in_pool(fn: Callable[[Any], Any], tasks: List[Any]) -> List[Any]:
+    """
+    Run fn over tasks in the shared process pool.
+
+    A pool broken by a dying worker is replaced and the tasks retried once,
+    so one crash doesn't fail every later scan in this process.
+    """
+    for attempt in range(2):
+        pool = get_process_pool()
+        try:
+            return list(pool.map(fn, tasks))
+        except BrokenProcessPool:
+            discard_process_pool(pool)
+            if attempt:
+                raise
+            logger.warning("Scan pool broke, retrying on a fresh pool")
+    return []
+
+
+def scan_repository(repo_path: str, parallel: bool = True, use_cache: bool = True) -> Dict[str, Any]:
+    """
+    Walk, count, parse manifests and index symbols for a repository.
+
+    Shards from plan_shards are scanned in the shared process pool and
+    merged into one result. Symbol entries already cached by git blob hash
+    are reused without re-reading the file, and whole scans are cached by
+    tree hash in the cache shared by all worker processes.
+
+    Args:
+        repo_path (str): Path to the repository
+        parallel (bool): Use the process pool when there is more than one shard
+        use_cache (bool): Reuse a scan of the same git tree from the shared cache
+
+    Returns:
+        Dict[str, Any]: Keys "directories", "files", "extensions",
+        "manifests" (relative path -> parsed), "symbols" (relative path ->
+        index entry) and "source_files" (count of indexable files)
+    """
+    # A clean checkout is fully described by its tree hash, so a scan of the
+    # same tree by any worker process can be reused as-is
+    tree = head_tree_hash(repo_path) if use_cache else None
+    if tree:
+        cached_scan = get_shared_cache().get(SCAN_CACHE_NAMESPACE, tree)
+        if cached_scan is not None:
+            return cached_scan
+
+    known_hashes = {
+        os.path.normpath(path): digest
+        for path, digest in tracked_blob_hashes(repo_path).items()
+        if language_for(path) and not _index_skipped(os.path.dirname(os.path.normpath(path)))
+    }
+    cached_entries = get_cached_entries(known_hashes.values())
+    symbols: Dict[str, Dict[str, Any]] = {
+        path: cached_entries[digest] for path, digest in known_hashes.items() if digest in cached_entries
+    }
+
+    # Each shard only receives the cached paths it could encounter
+    shards = plan_shards(repo_path)
+    tasks = [
+        (repo_path, relative_dir, recursive,
+         frozenset(path for path in symbols if _in_shard(path, (relative_dir, recursive))))
+        for relative_dir, recursive in shards
+    ]
+    if parallel and len(tasks) > 1 and MAX_WORKERS > 1:
+        partials = map_in_pool(scan_shard, tasks)
+    else:
+        partials = list(map(scan_shard, tasks))
+
+    merged: Dict[str, Any] = {
+        "directories": [],
+        "files": [],
+        "extensions": {},
+        "manifests": {},
+        "symbols": symbols,
+        "source_files": 0,
+    }
+    fresh = []
+    for partial in partials:
+        merged["directories"].extend(partial["directories"])
+        merged["files"].extend(partial["files"])
+        merged["source_files"] += partial["source_files"]
+        merged["manifests"].update(partial["manifests"])
+        for ext, count in partial["extensions"].items():
+            merged["extensions"][ext] = merged["extensions"].get(ext, 0) + count
+        for relative_path, digest, entry in partial["symbols"]:
+            if digest:
+                fresh.append((digest, entry))
+            symbols[relative_path] = entry
+    put_cached_entries(fresh)
+
+    merged["directories"].sort()
+    merged["files"].sort()
+    merged["symbols"] = dict(sorted(symbols.items()))
+    if tree:
+        get_shared_cache().set(SCAN_CACHE_NAMESPACE, tree, merged)
+    return merged
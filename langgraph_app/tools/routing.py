@@ -0,0 +1,104 @@
+import json
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+from .readme_sections import detect_languages
+
+# Roughly four characters per token for code outlines and JSON.
+CHARS_PER_TOKEN = 4
+
+# A repository is "small" if it is under every small limit, and "large" if
+# it reaches any large limit; everything else is "medium".
+SMALL_MAX_FILES = int(os.getenv("CODDOC_ROUTE_SMALL_MAX_FILES", 60))
+SMALL_MAX_PROMPT_TOKENS = int(os.getenv("CODDOC_ROUTE_SMALL_MAX_PROMPT_TOKENS", 4000))
+SMALL_MAX_LANGUAGES = 2
+LARGE_MIN_FILES = int(os.getenv("CODDOC_ROUTE_LARGE_MIN_FILES", 1500))
+LARGE_MIN_PROMPT_TOKENS = int(os.getenv("CODDOC_ROUTE_LARGE_MIN_PROMPT_TOKENS", 16000))
+LARGE_MIN_MANIFESTS = int(os.getenv("CODDOC_ROUTE_LARGE_MIN_MANIFESTS", 8))
+
+# Pipeline shape and generation settings per tier:
+# - single-shot: the whole README in one call, no separate analysis
+# - section-parallel: sections written in parallel from the scan
+# - map-reduce: the outline is summarized in parallel chunks first, and
+#   the sections are written from the summaries
+ROUTE_TIERS: Dict[str, Dict[str, Any]] = {
+    "small": {"pipeline": "single-shot", "max_output_tokens": 2048, "temperature": 0.4},
+    "medium": {"pipeline": "section-parallel", "max_output_tokens": 1024, "temperature": 0.4},
+    "large": {"pipeline": "map-reduce", "max_output_tokens": 1536, "temperature": 0.3, "map_output_tokens": 512},
+}
+
+PIPELINES = {tier["pipeline"] for tier in ROUTE_TIERS.values()}
+
+
+def estimate_prompt_tokens(state: Dict[str, Any]) -> int:
+    """
+    Estimate the tokens a full-context prompt for this repository would take:
+    the unbudgeted code outline, the structure listing and the manifests.
+    """
+    scan_stats = state.get("scan_stats", {})
+    chars = scan_stats.get("outline_chars", 0)
+    chars += len(json.dumps(state.get("repo_structure", {})))
+    chars += len(json.dumps(state.get("dependencies", {})))
+    return chars // CHARS_PER_TOKEN
+
+
+def size_tier(files: int, languages: int, manifests: int, prompt_tokens: int) -> str:
+    """Classify a repository as small, medium or large."""
+    if files >= LARGE_MIN_FILES or prompt_tokens >= LARGE_MIN_PROMPT_TOKENS or manifests >= LARGE_MIN_MANIFESTS:
+        return "large"
+    if files <= SMALL_MAX_FILES and prompt_tokens <= SMALL_MAX_PROMPT_TOKENS and languages <= SMALL_MAX_LANGUAGES:
+        return "small"
+    return "medium"
+
+
+def plan_route(
+    state: Dict[str, Any],
+    backends_for_tier: Callable[[str], List[str]],
+    pipeline: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Choose backends, output cap, temperature and pipeline shape for a scanned repository.
+
+    Args:
+        state (Dict[str, Any]): State after the scan
+        backends_for_tier (Callable[[str], List[str]]): Backend names serving
+            a tier, e.g. LLMRouter.backends_for
+        pipeline (Optional[str]): Pipeline forced by the request; the tier
+            still picks the model and generation settings
+
+    Returns:
+        Dict[str, Any]: The route, stored in state["route"]
+    """
+    scan_stats = state.get("scan_stats", {})
+    files = scan_stats.get("files", 0)
+    languages = len(detect_languages(scan_stats.get("extensions", {}), limit=100))
+    manifests = len(scan_stats.get("manifests", []))
+    prompt_tokens = estimate_prompt_tokens(state)
+    tier = size_tier(files, languages, manifests, prompt_tokens)
+    settings = ROUTE_TIERS[tier]
+    backends: List[str] = backends_for_tier(tier)
+    return {
+        "tier": tier,
+        "pipeline": pipeline or settings["pipeline"],
+        "backends": backends,
+        "max_output_tokens": settings["max_output_tokens"],
+        "temperature": settings["temperature"],
+        "map_output_tokens": settings.get("map_output_tokens"),
+        "signals": {
+            "files": files,
+            "languages": languages,
+            "manifests": manifests,
+            "estimated_prompt_tokens": prompt_tokens,
+        },
+    }
+
+
+def describe_route(route: Dict[str, Any]) -> str:
+    """One-line summary of a route for the decisions log."""
+    signals = route["signals"]
+    return (
+        f"Routed {route['tier']} repository to {route['pipeline']} on {', '.join(route['backends'])} "
+        f"(max {route['max_output_tokens']} output tokens, temperature {route['temperature']}) "
+        f"from {signals['files']} files, {signals['languages']} languages, "
+        f"{signals['manifests']} manifests, ~{signals['estimated_prompt_tokens']} prompt tokens"
+    )
@@ -0,0 +1,129 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# SQLite file shared by every worker process on the host.
+CACHE_DB = os.getenv("CODDOC_CACHE_DB", os.path.join(".coddoc", "cache.sqlite"))
+
+# Default lifetime of an entry; None-valued ttl means this default applies.
+DEFAULT_TTL_SECONDS = int(os.getenv("CODDOC_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+
+# Expired rows are deleted once every this many writes.
+PRUNE_EVERY_WRITES = 500
+
+# SQLite limits the number of bound parameters per statement.
+BATCH_SIZE = 500
+
+
+class SharedCache:
+    """
+    Process-safe key/value store on SQLite in WAL mode.
+
+    Values are JSON-encoded and grouped by namespace. Each thread of each
+    process gets its own connection; WAL lets readers proceed while another
+    process writes.
+    """
+
+    def __init__(self, path: str = CACHE_DB):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._writes = 0
+        with self._connection() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections must not cross a fork, so they are keyed by pid too
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        """Return the cached value, or None if it is missing or expired."""
+        row = self._connection().execute(
+            "SELECT value FROM cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (namespace, key, time.time()),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, namespace: str, keys: Iterable[str]) -> Dict[str, Any]:
+        """Return the cached values for every key that has one."""
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Any] = {}
+        conn = self._connection()
+        now = time.time()
+        for start in range(0, len(keys), BATCH_SIZE):
+            batch = keys[start:start + BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT key, value FROM cache WHERE namespace = ? AND expires_at > ? AND key IN ({placeholders})",
+                [namespace, now, *batch],
+            )
+            for key, value in rows:
+                found[key] = json.loads(value)
+        return found
+
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store a JSON-serializable value."""
+        self.set_many(namespace, [(key, value)], ttl)
+
+    def set_many(self, namespace: str, items: Iterable[Tuple[str, Any]], ttl: Optional[float] = None) -> None:
+        """Store several values in one transaction."""
+        expires_at = time.time() + (DEFAULT_TTL_SECONDS if ttl is None else ttl)
+        rows = [(namespace, key, json.dumps(value), expires_at) for key, value in items]
+        if not rows:
+            return
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        self._writes += 1
+        if self._writes % PRUNE_EVERY_WRITES == 0:
+            self.prune()
+
+    def delete(self, namespace: str, key: str) -> None:
+        """Remove an entry if present."""
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def prune(self) -> int:
+        """Delete expired entries and return how many were removed."""
+        conn = self._connection()
+        with conn:
+            return conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),)).rowcount
+
+
+_cache: Optional[SharedCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_shared_cache() -> SharedCache:
+    """Return the process-wide handle on the shared cache."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SharedCache()
+        return _cache
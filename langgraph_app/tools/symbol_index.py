@@ -0,0 +1,394 @@
+import ast
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .file_sampler import MAX_SAMPLE_FILE_BYTES, SNIFF_BYTES, classify_prefix
+from .shared_cache import get_shared_cache
+
+SKIP_DIRS = {'.git', 'node_modules', '__pycache__', 'venv', '.venv', 'dist', 'build', 'target', 'vendor'}
+
+LANGUAGE_BY_EXTENSION = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.jsx': 'javascript',
+    '.mjs': 'javascript',
+    '.cjs': 'javascript',
+    '.ts': 'typescript',
+    '.tsx': 'typescript',
+    '.go': 'go',
+    '.rs': 'rust',
+    '.java': 'java',
+}
+
+MAX_CACHE_ENTRIES = int(os.getenv("CODDOC_SYMBOL_CACHE_ENTRIES", 20000))
+
+# Namespace of symbol entries in the shared on-disk cache; bump it whenever
+# the extractors change so stale entries are ignored.
+CACHE_NAMESPACE = "symbols:v2"
+
+HTTP_METHODS = ('get', 'post', 'put', 'patch', 'delete', 'head', 'options', 'route', 'websocket', 'api_route')
+
+ARGPARSE_IMPORT = re.compile(r'^\s*(?:import\s+argparse|from\s+argparse\s+import)\b', re.M)
+
+_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def blob_hash(data: bytes) -> str:
+    """Compute the git blob SHA-1 of a file's contents."""
+    header = f"blob {len(data)}\0".encode()
+    return hashlib.sha1(header + data).hexdigest()
+
+
+def _empty_entry(language: str) -> Dict[str, Any]:
+    return {
+        "language": language,
+        "doc": "",
+        "classes": [],
+        "functions": [],
+        "routes": [],
+        "cli": [],
+        "main": False,
+    }
+
+
+def _route_methods(decorator: ast.Call) -> List[str]:
+    """Methods listed in methods=[...], as Flask's @app.route and FastAPI's @app.api_route take them."""
+    for keyword in decorator.keywords:
+        if keyword.arg == 'methods' and isinstance(keyword.value, (ast.List, ast.Tuple, ast.Set)):
+            return [item.value.upper() for item in keyword.value.elts
+                    if isinstance(item, ast.Constant) and isinstance(item.value, str)]
+    return []
+
+
+def _decorator_routes(decorator: ast.expr) -> List[str]:
+    """Turn @app.get("/path") / @app.route("/path", methods=["POST"]) into "GET /path" / "POST /path"."""
+    if not isinstance(decorator, ast.Call) or not isinstance(decorator.func, ast.Attribute):
+        return []
+    method = decorator.func.attr.lower()
+    if method not in HTTP_METHODS:
+        return []
+    if not decorator.args or not isinstance(decorator.args[0], ast.Constant):
+        return []
+    path = decorator.args[0].value
+    if not isinstance(path, str) or not path.startswith('/'):
+        return []
+    if method in ('route', 'api_route'):
+        # Both frameworks serve only GET when no methods are listed
+        return [f"{each} {path}" for each in _route_methods(decorator) or ['GET']]
+    return [f"{method.upper()} {path}"]
+
+
+def _decorator_cli(decorator: ast.expr) -> bool:
+    """Detect click/typer style @cli.command() / @click.group() decorators."""
+    target = decorator.func if isinstance(decorator, ast.Call) else decorator
+    return isinstance(target, ast.Attribute) and target.attr in ('command', 'group')
+
+
+def _is_main_guard(node: ast.stmt) -> bool:
+    if not isinstance(node, ast.If) or not isinstance(node.test, ast.Compare):
+        return False
+    parts = [node.test.left] + list(node.test.comparators)
+    names = {p.id for p in parts if isinstance(p, ast.Name)}
+    consts = {p.value for p in parts if isinstance(p, ast.Constant)}
+    return '__name__' in names and '__main__' in consts
+
+
+def extract_python(source: str) -> Dict[str, Any]:
+    """Extract top-level symbols from Python source using ast."""
+    entry = _empty_entry('python')
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return entry
+
+    doc = ast.get_docstring(tree)
+    if doc:
+        entry["doc"] = doc.strip().splitlines()[0][:160]
+
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            methods = [n.name for n in node.body
+                       if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef)) and not n.name.startswith('_')]
+            entry["classes"].append({"name": node.name, "methods": methods[:8]})
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if not node.name.startswith('_'):
+                entry["functions"].append(node.name)
+            for decorator in node.decorator_list:
+                routes = _decorator_routes(decorator)
+                if routes:
+                    entry["routes"].extend(routes)
+                elif _decorator_cli(decorator):
+                    entry["cli"].append(node.name)
+        elif _is_main_guard(node):
+            entry["main"] = True
+
+    if ARGPARSE_IMPORT.search(source) and 'ArgumentParser(' in source:
+        entry["cli"].append('argparse')
+    return entry
+
+
+REGEX_EXTRACTORS: Dict[str, Dict[str, "re.Pattern[str]"]] = {
+    'javascript': {
+        "classes": re.compile(r'^\s*(?:export\s+)?(?:default\s+)?class\s+([A-Za-z_$][\w$]*)', re.M),
+        "functions": re.compile(
+            r'^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*([A-Za-z_$][\w$]*)'
+            r'|^\s*export\s+(?:const|let)\s+([A-Za-z_$][\w$]*)\s*=', re.M),
+        "routes": re.compile(
+            r'\b(?:app|router|server|api)\.(get|post|put|patch|delete|all|use)\(\s*[\'"`](/[^\'"`]*)', re.I),
+        "main": re.compile(r'require\.main\s*===\s*module|\.listen\(\s*'),
+    },
+    'go': {
+        "classes": re.compile(r'^type\s+([A-Z]\w*)\s+(?:struct|interface)\b', re.M),
+        "functions": re.compile(r'^func\s+(?:\([^)]*\)\s*)?([A-Z]\w*)\s*\(', re.M),
+        "routes": re.compile(
+            r'\.(GET|POST|PUT|PATCH|DELETE|HandleFunc|Handle)\(\s*"(/[^"]*)"'),
+        "main": re.compile(r'^package\s+main\b[\s\S]*^func\s+main\s*\(', re.M),
+    },
+    'rust': {
+        "classes": re.compile(r'^\s*pub\s+(?:struct|enum|trait)\s+([A-Za-z_]\w*)', re.M),
+        "functions": re.compile(r'^\s*pub\s+(?:async\s+)?fn\s+([A-Za-z_]\w*)', re.M),
+        "routes": re.compile(r'#\[(get|post|put|patch|delete)\(\s*"(/[^"]*)"'),
+        "main": re.compile(r'^\s*(?:async\s+)?fn\s+main\s*\(', re.M),
+    },
+    'java': {
+        "classes": re.compile(r'^\s*public\s+(?:final\s+|abstract\s+)*(?:class|interface|enum|record)\s+([A-Za-z_]\w*)', re.M),
+        "functions": re.compile(r'^[ \t]*public[ \t]+(?:static[ \t]+)?(?:final[ \t]+)?[\w<>\[\],? \t]+?[ \t]+([a-z]\w*)[ \t]*\(', re.M),
+        "routes": re.compile(r'@(Get|Post|Put|Patch|Delete|Request)Mapping\(\s*(?:value\s*=\s*|path\s*=\s*)?"(/[^"]*)"'),
+        "main": re.compile(r'public\s+static\s+void\s+main\s*\('),
+    },
+}
+REGEX_EXTRACTORS['typescript'] = REGEX_EXTRACTORS['javascript']
+
+
+def extract_with_regex(source: str, language: str) -> Dict[str, Any]:
+    """Extract top-level symbols with lightweight per-language regexes."""
+    entry = _empty_entry(language)
+    patterns = REGEX_EXTRACTORS[language]
+
+    def names(pattern: "re.Pattern[str]", limit: int) -> List[str]:
+        found = []
+        for match in pattern.finditer(source):
+            name = next((g for g in match.groups() if g), None)
+            if name and name not in found:
+                found.append(name)
+            if len(found) >= limit:
+                break
+        return found
+
+    entry["classes"] = [{"name": name, "methods": []} for name in names(patterns["classes"], 20)]
+    entry["functions"] = names(patterns["functions"], 30)
+    for match in patterns["routes"].finditer(source):
+        method, path = match.group(1), match.group(2)
+        method = 'ANY' if method.lower() in ('handlefunc', 'handle', 'all', 'use') else method.upper()
+        method = 'ANY' if method == 'REQUEST' else method
+        entry["routes"].append(f"{method} {path}")
+        if len(entry["routes"]) >= 30:
+            break
+    entry["main"] = bool(patterns["main"].search(source))
+    return entry
+
+
+def index_file(task: Tuple[str, str]) -> Tuple[str, Optional[str], Optional[Dict[str, Any]]]:
+    """
+    Index a single file. Runs inside a worker process.
+
+    Args:
+        task: (relative_path, absolute_path)
+
+    Returns:
+        Tuple of (relative_path, blob_hash, entry); entry is None if the file
+        was skipped.
+    """
+    relative_path, filepath = task
+    try:
+        if os.path.getsize(filepath) > MAX_SAMPLE_FILE_BYTES:
+            return relative_path, None, None
+        with open(filepath, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return relative_path, None, None
+
+    digest = blob_hash(data)
+    if classify_prefix(data[:SNIFF_BYTES], filepath) is not None:
+        return relative_path, digest, None
+
+    source = data.decode('utf-8', errors='replace')
+    language = language_for(filepath)
+    if language == 'python':
+        entry = extract_python(source)
+    else:
+        entry = extract_with_regex(source, language)
+    return relative_path, digest, entry
+
+
+def language_for(filename: str) -> Optional[str]:
+    """Return the indexed language for a file name, or None."""
+    return LANGUAGE_BY_EXTENSION.get(os.path.splitext(filename)[1].lower())
+
+
+def get_cached_entries(digests: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Look up index entries by git blob hash.
+
+    The in-process LRU is checked first, then the on-disk cache shared with
+    the other worker processes.
+    """
+    found = {}
+    missing = []
+    with _cache_lock:
+        for digest in digests:
+            entry = _cache.get(digest)
+            if entry is not None:
+                _cache.move_to_end(digest)
+                found[digest] = entry
+            else:
+                missing.append(digest)
+    if missing:
+        shared = get_shared_cache().get_many(CACHE_NAMESPACE, missing)
+        _remember(shared.items())
+        found.update(shared)
+    return found
+
+
+def put_cached_entries(items: List[Tuple[str, Dict[str, Any]]]) -> None:
+    """Store index entries under their git blob hashes, locally and on disk."""
+    _remember(items)
+    get_shared_cache().set_many(CACHE_NAMESPACE, items)
+
+
+def _remember(items: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+    with _cache_lock:
+        for digest, entry in items:
+            _cache[digest] = entry
+            _cache.move_to_end(digest)
+        while len(_cache) > MAX_CACHE_ENTRIES:
+            _cache.popitem(last=False)
+
+
+def tracked_blob_hashes(repo_path: str) -> Dict[str, str]:
+    """
+    Map tracked file paths to their git blob hashes without reading them.
+
+    Returns an empty dict if repo_path is not a git work tree.
+    """
+    from git import Repo
+
+    try:
+        output = Repo(repo_path).git.ls_files('-s')
+    except Exception:
+        return {}
+    hashes = {}
+    for line in output.splitlines():
+        # "<mode> <sha> <stage>\t<path>"
+        meta, _, path = line.partition('\t')
+        fields = meta.split()
+        if len(fields) == 3:
+            hashes[path] = fields[1]
+    return hashes
+
+
+def _describe(entry: Dict[str, Any]) -> str:
+    """Render one index entry as a dense single-paragraph outline."""
+    parts = []
+    if entry.get("doc"):
+        parts.append(f'"{entry["doc"]}"')
+    if entry.get("main"):
+        parts.append("entry point")
+    if entry.get("routes"):
+        parts.append("routes: " + ", ".join(entry["routes"][:10]))
+    if entry.get("cli"):
+        parts.append("cli: " + ", ".join(entry["cli"][:5]))
+    if entry.get("classes"):
+        classes = []
+        for cls in entry["classes"][:10]:
+            methods = cls.get("methods") or []
+            classes.append(f"{cls['name']}({', '.join(methods)})" if methods else cls["name"])
+        parts.append("classes: " + ", ".join(classes))
+    if entry.get("functions"):
+        parts.append("functions: " + ", ".join(entry["functions"][:15]))
+    return "; ".join(parts)
+
+
+def _priority(item: Tuple[str, Dict[str, Any]]) -> Tuple[int, int, int, str]:
+    path, entry = item
+    has_entry = entry.get("main") or entry.get("routes") or entry.get("cli")
+    symbols = len(entry.get("classes", [])) + len(entry.get("functions", []))
+    return (0 if has_entry else 1, path.count(os.sep), -symbols, path)
+
+
+def outline_size(index: Dict[str, Dict[str, Any]]) -> int:
+    """Characters an outline of the whole index would take, with no budget."""
+    total = 0
+    for path, entry in index.items():
+        description = _describe(entry)
+        if description:
+            total += len(path) + len(description) + 2
+    return total
+
+
+def outline_entries(index: Dict[str, Dict[str, Any]], max_chars: int = 6000) -> Dict[str, str]:
+    """
+    Condense a symbol index into per-file outlines within a character budget.
+
+    Entry points, routes and CLIs come first, then shallow files with the
+    most symbols.
+    """
+    outline = {}
+    used = 0
+    for path, entry in sorted(index.items(), key=_priority):
+        description = _describe(entry)
+        if not description:
+            continue
+        cost = len(path) + len(description) + 2
+        if used + cost > max_chars:
+            break
+        outline[path] = description
+        used += cost
+    return outline
+
+
+def truncate_outline(outline: Dict[str, str], max_chars: int = 6000) -> Dict[str, str]:
+    """
+    The leading entries of an outline that fit in max_chars.
+
+    outline_entries() fills its budget in priority order, so this equals an
+    outline built with the smaller budget, without describing every file again.
+    """
+    truncated = {}
+    used = 0
+    for path, description in outline.items():
+        cost = len(path) + len(description) + 2
+        if used + cost > max_chars:
+            break
+        truncated[path] = description
+        used += cost
+    return truncated
+
+
+def entry_point_entries(index: Dict[str, Dict[str, Any]], limit: int = 20) -> List[Dict[str, Any]]:
+    """
+    List the files that start a program, serve routes or define a CLI.
+
+    Returns:
+        List[Dict[str, Any]]: path, language, main, routes and cli per file,
+        shallowest and richest first
+    """
+    entries = []
+    for path, entry in sorted(index.items(), key=_priority):
+        if not (entry.get("main") or entry.get("routes") or entry.get("cli")):
+            break
+        entries.append({
+            "path": path,
+            "language": entry.get("language"),
+            "main": bool(entry.get("main")),
+            "routes": entry.get("routes", []),
+            "cli": entry.get("cli", []),
+        })
+        if len(entries) >= limit:
+            break
+    return entries
@@ -0,0 +1,428 @@
+import fcntl
+import hashlib
+import logging
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _default_root() -> str:
+    if os.getenv("CODDOC_WORKSPACE_TMPFS", "").lower() in ("1", "true", "yes") and os.path.isdir("/dev/shm"):
+        return os.path.join("/dev/shm", "coddoc-workspaces")
+    return os.path.join(tempfile.gettempdir(), "coddoc-workspaces")
+
+
+WORKSPACE_ROOT = os.getenv("CODDOC_WORKSPACE_ROOT") or _default_root()
+MAX_WORKSPACE_BYTES = int(os.getenv("CODDOC_MAX_WORKSPACE_BYTES", 500 * 1024 * 1024))
+MAX_TOTAL_WORKSPACE_BYTES = int(os.getenv("CODDOC_MAX_TOTAL_WORKSPACE_BYTES", 5 * 1024 * 1024 * 1024))
+CLONE_TIMEOUT_SECONDS = float(os.getenv("CODDOC_CLONE_TIMEOUT_SECONDS", 120))
+
+# Shallow bare mirrors of remote repositories, shared by every worker process.
+MIRRORS_ENABLED = os.getenv("CODDOC_REPO_MIRRORS", "1").lower() in ("1", "true", "yes")
+MIRROR_ROOT = os.path.abspath(os.getenv("CODDOC_MIRROR_ROOT", os.path.join(".coddoc", "mirrors")))
+MIRROR_REFRESH_SECONDS = float(os.getenv("CODDOC_MIRROR_REFRESH_SECONDS", 60))
+MIRROR_MAX_AGE_SECONDS = float(os.getenv("CODDOC_MIRROR_MAX_AGE_SECONDS", 7 * 24 * 3600))
+# How often unused mirrors are pruned.
+MIRROR_PRUNE_INTERVAL_SECONDS = float(os.getenv("CODDOC_MIRROR_PRUNE_INTERVAL_SECONDS", 600))
+
+# How often a running clone is measured against the quotas.
+QUOTA_POLL_SECONDS = 0.5
+
+# How often a busy mirror lock is retried.
+LOCK_POLL_SECONDS = 0.1
+
+# How long a measurement of the workspace and mirror roots is reused. The
+# roots are shared by every worker process, so the global quota is checked
+# against what is on disk rather than against this process's own clones.
+USAGE_CACHE_SECONDS = float(os.getenv("CODDOC_WORKSPACE_USAGE_CACHE_SECONDS", 2))
+
+WORKSPACE_PREFIX = "ws-"
+TRASH_PREFIX = ".trash-"
+
+
+class WorkspaceQuotaExceeded(Exception):
+    """Raised when a workspace would exceed its own or the global disk quota."""
+
+
+def disk_usage(path: str) -> int:
+    """Total size in bytes of the files under path, without following symlinks."""
+    total = 0
+    stack = [path]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+    return total
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class WorkspaceManager:
+    """
+    Allocates per-request clone directories under one root.
+
+    Workspaces are named after the owning process, so a sweep at startup can
+    tell which ones were orphaned by a crash. Deletion happens on a
+    background thread: release() only renames the directory out of the way.
+    The global quota covers everything under the workspace and mirror roots,
+    whichever worker process wrote it; the same thread prunes mirrors every
+    MIRROR_PRUNE_INTERVAL_SECONDS.
+    """
+
+    def __init__(
+        self,
+        root: str = WORKSPACE_ROOT,
+        max_workspace_bytes: int = MAX_WORKSPACE_BYTES,
+        max_total_bytes: int = MAX_TOTAL_WORKSPACE_BYTES,
+    ):
+        self.root = root
+        self.max_workspace_bytes = max_workspace_bytes
+        self.max_total_bytes = max_total_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+        # Bytes per directory under the workspace and mirror roots, as last
+        # measured, for the global quota
+        self._usage: Dict[str, int] = {}
+        self._measured_at = float("-inf")
+        self._last_prune = time.monotonic()
+        self._lock = threading.Lock()
+        self._deletions: "queue.Queue[str]" = queue.Queue()
+        self._deleter = threading.Thread(target=self._delete_loop, name="workspace-deleter", daemon=True)
+        self._deleter.start()
+
+        self.sweep_orphans()
+
+    def _measure(self) -> Dict[str, int]:
+        """Bytes per workspace, pending-delete workspace and mirror of every worker process."""
+        with self._lock:
+            if time.monotonic() - self._measured_at <= USAGE_CACHE_SECONDS:
+                return dict(self._usage)
+        usage = {}
+        for root in (self.root, MIRROR_ROOT):
+            try:
+                names = os.listdir(root)
+            except OSError:
+                continue
+            for name in names:
+                path = os.path.join(root, name)
+                if os.path.isdir(path):
+                    usage[path] = disk_usage(path)
+        with self._lock:
+            self._usage = usage
+            self._measured_at = time.monotonic()
+        return dict(usage)
+
+    def total_usage(self) -> int:
+        """Bytes currently held under the workspace and mirror roots."""
+        return sum(self._measure().values())
+
+    def sweep_orphans(self) -> int:
+        """
+        Schedule deletion of workspaces left behind by dead processes.
+
+        Returns:
+            int: Number of directories scheduled for deletion
+        """
+        swept = 0
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.startswith(TRASH_PREFIX):
+                orphaned = True
+            elif name.startswith(WORKSPACE_PREFIX):
+                pid = name[len(WORKSPACE_PREFIX):].split("-", 1)[0]
+                orphaned = not pid.isdigit() or not _pid_alive(int(pid))
+            else:
+                continue
+            if orphaned:
+                self._deletions.put(path)
+                swept += 1
+        if swept:
+            logger.info(f"Reclaiming {swept} orphaned workspaces under {self.root}")
+        pruned = self.prune_mirrors()
+        if pruned:
+            logger.info(f"Removed {pruned} unused repository mirrors")
+        return swept
+
+    def allocate(self) -> str:
+        """
+        Create an empty workspace directory.
+
+        Raises:
+            WorkspaceQuotaExceeded: If the global quota is already used up,
+                even after evicting idle mirrors
+        """
+        if self.total_usage() >= self.max_total_bytes:
+            self.prune_mirrors(target_bytes=self.max_total_bytes)
+        if self.total_usage() >= self.max_total_bytes:
+            raise WorkspaceQuotaExceeded("Workspace disk quota exhausted, try again later")
+        path = os.path.join(self.root, f"{WORKSPACE_PREFIX}{os.getpid()}-{uuid.uuid4().hex[:12]}")
+        os.makedirs(path)
+        return path
+
+    def release(self, path: str) -> None:
+        """Hand a workspace to the background deleter and return immediately."""
+        target = path
+        trash = os.path.join(self.root, TRASH_PREFIX + os.path.basename(path))
+        try:
+            os.rename(path, trash)
+            target = trash
+        except OSError:
+            pass
+        with self._lock:
+            if path in self._usage:
+                self._usage[target] = self._usage.pop(path)
+        self._deletions.put(target)
+
+    @contextmanager
+    def workspace(self) -> Iterator[str]:
+        """Allocate a workspace that is released however the block exits."""
+        path = self.allocate()
+        try:
+            yield path
+        finally:
+            self.release(path)
+
+    def _check_quota(self, path: str) -> None:
+        used = disk_usage(path)
+        usage = self._measure()
+        usage[path] = used
+        with self._lock:
+            self._usage[path] = used
+        total = sum(usage.values())
+        if used > self.max_workspace_bytes:
+            raise WorkspaceQuotaExceeded(
+                f"Repository exceeds the {self.max_workspace_bytes // (1024 * 1024)} MB workspace limit"
+            )
+        if total > self.max_total_bytes:
+            raise WorkspaceQuotaExceeded("Workspace disk quota exhausted, try again later")
+
+    def run_git(self, args: List[str], check: Callable[[], None], deadline: float) -> None:
+        """
+        Run a git command, calling check() every poll until it exits.
+
+        The process is killed if check() raises or the deadline passes.
+
+        Raises:
+            TimeoutError: If the deadline passes
+            Exception: If git exits with a non-zero status
+        """
+        from git import Git
+
+        handle = Git(self.root).execute(
+            ["git", *args],
+            as_process=True,
+            env={"GIT_TERMINAL_PROMPT": "0"},
+        )
+        proc = handle.proc
+        try:
+            while True:
+                try:
+                    proc.wait(timeout=QUOTA_POLL_SECONDS)
+                    break
+                except subprocess.TimeoutExpired:
+                    pass
+                if time.monotonic() > deadline:
+                    raise TimeoutError("Cloning took too long")
+                check()
+        except BaseException:
+            proc.kill()
+            proc.wait()
+            raise
+        check()
+
+        if proc.returncode != 0:
+            stderr = proc.stderr.read().decode(errors="replace").strip() if proc.stderr else ""
+            raise Exception(stderr or f"git {args[0]} exited with status {proc.returncode}")
+
+    def clone(self, repo_url: str, path: str, timeout: Optional[float] = None) -> str:
+        """
+        Shallow-clone repo_url into an allocated workspace, enforcing quotas.
+
+        With mirrors enabled the remote is fetched once into a shared bare
+        mirror and the workspace is a local clone of it. Every clone is
+        measured while it runs and killed as soon as it goes over the
+        per-workspace or global quota, or over the timeout.
+
+        Raises:
+            WorkspaceQuotaExceeded: If a quota is exceeded
+            TimeoutError: If the clone takes longer than timeout
+            Exception: If git fails
+        """
+        timeout = CLONE_TIMEOUT_SECONDS if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        check = lambda: self._check_quota(path)
+
+        # git clones into an existing directory as long as it is empty
+        if not MIRRORS_ENABLED:
+            self.run_git(["clone", "--depth", "1", "--quiet", "--", repo_url, path], check, deadline)
+            return path
+        with self._mirror_lease(repo_url, deadline) as mirror:
+            self.run_git(["clone", "--quiet", "--", mirror, path], check, deadline)
+        return path
+
+    @contextmanager
+    def _mirror_lease(self, repo_url: str, deadline: float) -> Iterator[str]:
+        """
+        Yield an up-to-date shallow bare mirror of repo_url.
+
+        Creating or refreshing a mirror holds an exclusive file lock, so
+        worker processes never fetch the same repository twice at once;
+        the lock is then held shared while the caller clones from it.
+        """
+        os.makedirs(MIRROR_ROOT, exist_ok=True)
+        path = os.path.join(MIRROR_ROOT, hashlib.sha256(repo_url.encode()).hexdigest()[:32] + ".git")
+        stamp = path + ".fetched"
+
+        check = lambda: self._check_quota(path)
+
+        with open(path + ".lock", "a") as lock:
+            # Another worker may be fetching the same repository; wait for
+            # it only as long as this clone may take
+            while True:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() > deadline:
+                        raise TimeoutError("Timed out waiting for another fetch of the repository")
+                    time.sleep(LOCK_POLL_SECONDS)
+            try:
+                if not os.path.isdir(path):
+                    self.run_git(
+                        ["clone", "--bare", "--depth", "1", "--single-branch", "--quiet", "--", repo_url, path],
+                        check, deadline,
+                    )
+                    open(stamp, "w").close()
+                elif time.time() - os.path.getmtime(stamp if os.path.exists(stamp) else path) > MIRROR_REFRESH_SECONDS:
+                    ref = self._mirror_head(path)
+                    self.run_git(
+                        ["-C", path, "fetch", "--depth", "1", "--quiet", "origin", f"+{ref}:{ref}"],
+                        check, deadline,
+                    )
+                    open(stamp, "w").close()
+            except BaseException:
+                if not os.path.exists(stamp):
+                    shutil.rmtree(path, ignore_errors=True)
+                    with self._lock:
+                        self._usage.pop(path, None)
+                raise
+            # Marks the mirror as recently used for prune_mirrors()
+            os.utime(path)
+            fcntl.flock(lock, fcntl.LOCK_SH)
+            yield path
+
+    @staticmethod
+    def _mirror_head(path: str) -> str:
+        from git import Git
+
+        return Git(path).symbolic_ref("HEAD").strip()
+
+    def prune_mirrors(self, max_age_seconds: float = MIRROR_MAX_AGE_SECONDS, target_bytes: Optional[int] = None) -> int:
+        """
+        Delete mirrors not used for max_age_seconds.
+
+        Mirrors held by a running clone are always kept. With target_bytes,
+        idle mirrors are also evicted least recently used first until the
+        total usage is at most target_bytes.
+
+        Returns:
+            int: Number of mirrors removed
+        """
+        self._last_prune = time.monotonic()
+        if not os.path.isdir(MIRROR_ROOT):
+            return 0
+        removed = 0
+        cutoff = time.time() - max_age_seconds
+        mirrors = []
+        for name in os.listdir(MIRROR_ROOT):
+            path = os.path.join(MIRROR_ROOT, name)
+            if not name.endswith(".git"):
+                continue
+            try:
+                mirrors.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+        for used_at, path in sorted(mirrors):
+            if used_at > cutoff and (target_bytes is None or self.total_usage() <= target_bytes):
+                continue
+            with open(path + ".lock", "a") as lock:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    continue
+                shutil.rmtree(path, ignore_errors=True)
+                for suffix in (".fetched", ".lock"):
+                    try:
+                        os.remove(path + suffix)
+                    except FileNotFoundError:
+                        pass
+            with self._lock:
+                self._usage.pop(path, None)
+            removed += 1
+        return removed
+
+    def _delete_loop(self) -> None:
+        while True:
+            try:
+                path = self._deletions.get(timeout=MIRROR_PRUNE_INTERVAL_SECONDS)
+            except queue.Empty:
+                path = None
+            if path is not None:
+                try:
+                    shutil.rmtree(path)
+                except FileNotFoundError:
+                    pass
+                except Exception as e:
+                    logger.warning(f"Failed to delete workspace {path}: {e}")
+                finally:
+                    with self._lock:
+                        self._usage.pop(path, None)
+                    self._deletions.task_done()
+            if MIRRORS_ENABLED and time.monotonic() - self._last_prune >= MIRROR_PRUNE_INTERVAL_SECONDS:
+                try:
+                    pruned = self.prune_mirrors()
+                except Exception as e:
+                    logger.warning(f"Failed to prune repository mirrors: {e}")
+                else:
+                    if pruned:
+                        logger.info(f"Removed {pruned} unused repository mirrors")
+
+
+_manager: Optional[WorkspaceManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_workspace_manager() -> WorkspaceManager:
+    """Return the process-wide workspace manager, sweeping orphans on first use."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = WorkspaceManager()
+        return _manager
@@ -1,14 +1,25 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Dict, List, Optional
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+import asyncio
+import math
 import os
+import time
 import traceback
 import logging
 from dotenv import load_dotenv
-from langgraph_app.tools.git_utils import clone_repo
-from langgraph_app.agents.repo_analyzer import RepoAnalyzerAgent
-from langgraph_app.agents.readme_writer import ReadmeWriterAgent
+from langgraph_app.tools.admission import Overloaded, get_admission_controller
+from langgraph_app.tools.deadlines import deadline_scope, remaining
+from langgraph_app.tools.git_utils import cleanup_repo, clone_repo, head_commit, remote_head
+from langgraph_app.tools.readme_store import etag_for, etag_matches, get_readme, normalize_repo_url, put_readme, readme_key
+from langgraph_app.tools.workspace import CLONE_TIMEOUT_SECONDS, WorkspaceQuotaExceeded, get_workspace_manager
+
+# Agents, LLM clients and the process pool are loaded lazily by warm_up()
+# (or by the first request), so the process can answer /health immediately.
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,10 +28,18 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up in the background; the server accepts connections meanwhile."""
+    app.state.warm_up_task = asyncio.create_task(warm_up())
+    yield
+    app.state.warm_up_task.cancel()
+
 app = FastAPI(
     title="AI README Generator",
     description="Generate comprehensive README.md files using AI agents",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -32,28 +51,128 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def llm_configured() -> bool:
+    """Whether any LLM backend is configured (see tools/llm_backends.py)."""
+    return bool(os.getenv("GEMINI_API_KEY") or os.getenv("CODDOC_LLM_BACKENDS"))
+
+# Readiness, reported by /ready
+warm_state: Dict[str, Any] = {"ready": False, "error": None, "seconds": None}
+
+def warm_up_sync() -> None:
+    """Import heavy dependencies and build shared clients ahead of traffic."""
+    started = time.perf_counter()
+    get_workspace_manager()
+    from langgraph_app.agents.repo_analyzer import RepoAnalyzerAgent
+    from langgraph_app.agents.readme_writer import ReadmeWriterAgent
+    from langgraph_app.pipeline import run_fast, run_pipelined, run_routed
+    from langgraph_app.tools.process_pool import warm_process_pool
+    if llm_configured():
+        from langgraph_app.tools.llm_router import get_llm_router
+        get_llm_router()
+    warm_process_pool()
+    warm_state["seconds"] = round(time.perf_counter() - started, 3)
+
+async def warm_up() -> None:
+    try:
+        await asyncio.to_thread(warm_up_sync)
+        warm_state["ready"] = True
+        logger.info(f"Warm-up completed in {warm_state['seconds']}s")
+    except Exception as e:
+        warm_state["error"] = str(e)
+        logger.error(f"Warm-up failed: {str(e)}")
+
 class RepoRequest(BaseModel):
     repo_url: str
+    # "auto" picks the pipeline from the repository's size; "pipelined"
+    # writes README sections in parallel to cut latency; "fast" renders a
+    # README from the scan alone, without the LLM; "graph" runs the
+    # checkpointed LangGraph workflow, which can be resumed
+    mode: Literal["auto", "sequential", "pipelined", "fast", "graph"] = "auto"
+    # Graph mode only: the thread_id of an earlier run that failed (from its
+    # X-Thread-Id error header) resumes it; omitted, a new thread is started
+    thread_id: Optional[str] = None
+    # Total seconds the client will wait, queueing included; bounds the
+    # clone and LLM timeouts, and an LLM step that runs out of time falls
+    # back to the deterministic README
+    deadline_seconds: Optional[float] = Field(default=None, gt=0)
 
 class ReadmeResponse(BaseModel):
     readme: str
     log: List[str]
     decisions: List[Dict]
     thread_id: str
+    # Content key (repository, commit, pipeline version and mode); GET
+    # /readme/{key} serves the same response again. None if not stored.
+    key: Optional[str] = None
 
-@app.post("/generate-readme", response_model=ReadmeResponse)
-async def generate_readme(request: RepoRequest):
+# Responses under a content key never change, so caches may keep them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# POST responses may be reused only after revalidating through /readme/{key}
+REVALIDATE_CACHE_CONTROL = "no-cache"
+# Seconds allowed for finding the remote HEAD before cloning
+REMOTE_HEAD_TIMEOUT_SECONDS = 10
+# Concurrent remote HEAD lookups; they run before admission, so they get
+# their own threads rather than the default executor admitted requests use
+REMOTE_HEAD_WORKERS = int(os.getenv("CODDOC_REMOTE_HEAD_WORKERS", 4))
+remote_head_executor = ThreadPoolExecutor(max_workers=REMOTE_HEAD_WORKERS, thread_name_prefix="remote-head")
+remote_head_in_flight = 0
+
+def readme_response(payload: Dict[str, Any], cache_control: str) -> JSONResponse:
+    """JSON response with the ETag and location of a stored README."""
+    headers = {"Cache-Control": cache_control}
+    if payload.get("key"):
+        headers["ETag"] = etag_for(payload["key"])
+        headers["Content-Location"] = f"/readme/{payload['key']}"
+    return JSONResponse(content=payload, headers=headers)
+
+def resume_headers(request: RepoRequest) -> Optional[Dict[str, str]]:
+    """Headers telling the client which graph-mode thread to resume after a failure."""
+    return {"X-Thread-Id": request.thread_id} if request.thread_id else None
+
+def retry_headers(request: RepoRequest) -> Dict[str, str]:
+    """
+    Headers for a 503 caused by a full workspace or a missed deadline.
+    
+    Disk and time free up as running requests finish, so the client is told
+    to retry after about one average request.
+    """
+    retry_after = max(1, math.ceil(get_admission_controller().service_seconds))
+    return {"Retry-After": str(retry_after), **(resume_headers(request) or {})}
+
+async def lookup_remote_head(repo_url: str) -> Optional[str]:
+    """
+    Find the commit a POST would document, before the request is admitted.
+    
+    Skipped (None) when every lookup thread is busy or the admission queue
+    is full: a burst is then shed by admission control instead of piling up
+    git ls-remote calls.
+    """
+    global remote_head_in_flight
+    controller = get_admission_controller()
+    if remote_head_in_flight >= REMOTE_HEAD_WORKERS or controller.waiting >= controller.max_queued:
+        return None
+    remote_head_in_flight += 1
+    try:
+        loop = asyncio.get_running_loop()
+        timeout = remaining(REMOTE_HEAD_TIMEOUT_SECONDS)
+        return await loop.run_in_executor(remote_head_executor, remote_head, repo_url, timeout)
+    finally:
+        remote_head_in_flight -= 1
+
+async def generate_admitted(request: RepoRequest) -> ReadmeResponse:
+    """Clone and document a repository once the request holds a slot."""
+    # Clone the repository off the event loop; the workspace is released in
+    # the background however this block exits. Worker threads inherit the
+    # request deadline from the context.
+    logger.info("Cloning repository...")
+    clone = asyncio.ensure_future(asyncio.to_thread(clone_repo, request.repo_url, remaining(CLONE_TIMEOUT_SECONDS)))
+    try:
+        repo_path = await asyncio.shield(clone)
+    except asyncio.CancelledError:
+        # The clone thread can't be interrupted; release what it produces
+        clone.add_done_callback(lambda done: done.cancelled() or done.exception() or cleanup_repo(done.result()))
+        raise
     try:
-        logger.info(f"Received request for repo: {request.repo_url}")
-        
-        # Validate API key
-        if not os.getenv("GEMINI_API_KEY"):
-            logger.error("GEMINI_API_KEY not found in environment")
-            raise HTTPException(status_code=500, detail="GEMINI_API_KEY environment variable is required")
-        
-        # Clone the repository
-        logger.info("Cloning repository...")
-        repo_path = clone_repo(request.repo_url)
         logger.info(f"Repository cloned to: {repo_path}")
         
         # Initialize simplified state
@@ -71,43 +190,158 @@ async def generate_readme(request: RepoRequest):
         
         logger.info("Starting simplified workflow...")
         
-        # Step 1: Analyze repository
-        logger.info("Running repo analyzer...")
-        repo_analyzer = RepoAnalyzerAgent()
-        state = repo_analyzer.process(state)
-        logger.info("Repo analysis completed")
+        # No-ops once warm-up has imported them
+        from langgraph_app.agents.repo_analyzer import RepoAnalyzerAgent
+        from langgraph_app.agents.readme_writer import ReadmeWriterAgent
+        from langgraph_app.pipeline import run_fast, run_pipelined, run_routed
+        
+        if request.mode == "auto":
+            logger.info("Running routed workflow...")
+            state = await run_routed(state)
+            logger.info("README generation completed")
+        elif request.mode == "fast":
+            logger.info("Running fast workflow...")
+            state = await run_fast(state)
+            logger.info("README generation completed")
+        elif request.mode == "pipelined":
+            logger.info("Running pipelined workflow...")
+            state = await run_pipelined(state)
+            logger.info("README generation completed")
+        elif request.mode == "graph":
+            from langgraph_app.langgraph_runner import run_langgraph
+            from langgraph_app.tools.checkpoints import ThreadConflict, new_thread_id
+            # Fixed up front, so a failed run can report it for resuming
+            request.thread_id = request.thread_id or new_thread_id(request.repo_url)
+            logger.info(f"Running checkpointed workflow {request.thread_id}...")
+            try:
+                state = await run_langgraph(state, thread_id=request.thread_id)
+            except ThreadConflict as e:
+                raise HTTPException(status_code=409, detail=str(e))
+            logger.info("README generation completed")
+        else:
+            # Step 1: Analyze repository
+            logger.info("Running repo analyzer...")
+            repo_analyzer = RepoAnalyzerAgent()
+            state = await asyncio.to_thread(repo_analyzer.process, state)
+            logger.info("Repo analysis completed")
+            
+            # Step 2: Generate README
+            logger.info("Running readme writer...")
+            readme_writer = ReadmeWriterAgent()
+            state = await asyncio.to_thread(readme_writer.process, state)
+            logger.info("README generation completed")
         
-        # Step 2: Generate README
-        logger.info("Running readme writer...")
-        readme_writer = ReadmeWriterAgent()
-        state = readme_writer.process(state)
-        logger.info("README generation completed")
+        commit = await asyncio.to_thread(head_commit, repo_path)
+    finally:
+        cleanup_repo(repo_path)
+    
+    response = ReadmeResponse(
+        readme=state.get("readme", ""),
+        log=state.get("log", []),
+        decisions=state.get("decisions", []),
+        thread_id=state.get("thread_id") or "simplified_workflow"
+    )
+    # A README written around an LLM failure is served but never stored, and
+    # neither is one from a checkpoint of any other repository
+    same_repo = normalize_repo_url(state.get("repo_url", "")) == normalize_repo_url(request.repo_url)
+    if commit and same_repo and not state.get("degraded"):
+        response.key = readme_key(request.repo_url, commit, request.mode)
+        put_readme(response.key, response.model_dump())
+    return response
+
+@app.post("/generate-readme", response_model=ReadmeResponse)
+async def generate_readme(request: RepoRequest, if_none_match: Optional[str] = Header(default=None)):
+    try:
+        logger.info(f"Received request for repo: {request.repo_url}")
         
-        # Clean up
-        try:
-            from langgraph_app.tools.git_utils import cleanup_repo
-            cleanup_repo(repo_path)
-        except:
-            pass
+        # Validate LLM configuration; fast mode never calls the LLM
+        if request.mode != "fast" and not llm_configured():
+            logger.error("No LLM backend configured")
+            raise HTTPException(status_code=500, detail="GEMINI_API_KEY or CODDOC_LLM_BACKENDS environment variable is required")
         
-        return ReadmeResponse(
-            readme=state.get("readme", ""),
-            log=state.get("log", []),
-            decisions=state.get("decisions", []),
-            thread_id="simplified_workflow"
-        )
+        # The deadline runs from arrival, so time spent queued counts; the
+        # clone and every LLM call are cut short to fit what is left
+        with deadline_scope(request.deadline_seconds):
+            # A repeat for a commit that was already documented is answered
+            # without cloning or queueing; the lookup itself happens before
+            # admission, on its own bounded pool
+            commit = await lookup_remote_head(request.repo_url)
+            if commit:
+                key = readme_key(request.repo_url, commit, request.mode)
+                stored = get_readme(key)
+                # A POST is not a read, so a matching If-None-Match fails the
+                # precondition (RFC 9110) rather than answering 304
+                if etag_matches(if_none_match, etag_for(key), stored is not None):
+                    return Response(status_code=412, headers={"ETag": etag_for(key), "Cache-Control": REVALIDATE_CACHE_CONTROL})
+                if stored is not None:
+                    logger.info(f"Serving stored README {key}")
+                    return readme_response(stored, REVALIDATE_CACHE_CONTROL)
+            
+            async with get_admission_controller().admit(remaining()):
+                response = await generate_admitted(request)
+            return readme_response(response.model_dump(), REVALIDATE_CACHE_CONTROL)
         
+    except HTTPException:
+        raise
+    except Overloaded as e:
+        logger.warning(f"Rejected {request.repo_url}: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except (WorkspaceQuotaExceeded, TimeoutError) as e:
+        logger.warning(f"Rejected clone of {request.repo_url}: {str(e)}")
+        raise HTTPException(status_code=503, detail=str(e), headers=retry_headers(request))
     except Exception as e:
         logger.error(f"Error in generate_readme: {str(e)}")
         logger.error(f"Traceback: {traceback.format_exc()}")
-        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}", headers=resume_headers(request))
+
+@app.get("/readme/{key}", response_model=ReadmeResponse)
+async def get_readme_by_key(key: str, if_none_match: Optional[str] = Header(default=None)):
+    """
+    Serve a stored README by its content key.
+    
+    The key pins the commit, so the response is immutable and can be cached
+    by browsers and CDNs indefinitely.
+    """
+    etag = etag_for(key)
+    stored = get_readme(key)
+    if etag_matches(if_none_match, etag, stored is not None):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL})
+    if stored is None:
+        raise HTTPException(status_code=404, detail="README not found")
+    return readme_response(stored, IMMUTABLE_CACHE_CONTROL)
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: 200 once heavy dependencies are loaded, 503 before."""
+    if warm_state["ready"]:
+        return {
+            "status": "ready",
+            "warmup_seconds": warm_state["seconds"],
+            "admission": get_admission_controller().stats(),
+        }
+    status = "failed" if warm_state["error"] else "warming"
+    return JSONResponse(status_code=503, content={"status": status, "error": warm_state["error"]})
+
+@app.get("/llm/backends")
+async def llm_backends():
+    """Configured LLM backends with their circuit breaker state and p95 latency."""
+    if not llm_configured():
+        return {"backends": []}
+    from langgraph_app.tools.llm_router import get_llm_router
+    return {"backends": get_llm_router().stats()}
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port) 
\ No newline at end of file
+    workers = int(os.getenv("CODDOC_WEB_WORKERS", os.getenv("WEB_CONCURRENCY", 1)))
+    if workers > 1:
+        # Workers share clones, scans and LLM responses through the on-disk
+        # caches; use gunicorn.conf.py instead to preload the app
+        uvicorn.run("main:app", host="0.0.0.0", port=port, workers=workers)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=port)
@@ -3,6 +3,82 @@ import { type NextRequest, NextResponse } from "next/server"
 // Backend API URL - change this to your deployed FastAPI URL in production
 const BACKEND_URL = process.env.BACKEND_URL || "https://coddoc.onrender.com"
 
+// README responses are stored by the backend under a content key (repo URL,
+// commit SHA, pipeline version). The key's response never changes, so
+// once known it is fetched through the Next.js data cache and never
+// reaches Python again.
+const IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+// How long a repo's last key is trusted before revalidating it with the
+// backend (which checks the repo's current commit).
+const KEY_FRESH_MS = 60_000
+const MAX_REMEMBERED_REPOS = 500
+
+type ReadmeKey = { key: string; etag: string; checkedAt: number }
+const recentKeys = new Map<string, ReadmeKey>()
+
+function rememberKey(repoUrl: string, key: string, etag: string) {
+  recentKeys.delete(repoUrl)
+  recentKeys.set(repoUrl, { key, etag, checkedAt: Date.now() })
+  if (recentKeys.size > MAX_REMEMBERED_REPOS) {
+    recentKeys.delete(recentKeys.keys().next().value as string)
+  }
+}
+
+async function fetchStoredReadme(key: string) {
+  // force-cache: served from the data cache after the first fetch
+  const response = await fetch(`${BACKEND_URL}/readme/${encodeURIComponent(key)}`, { cache: "force-cache" })
+  return response.ok ? response.json() : null
+}
+
+function requestReadme(repoUrl: string, etag?: string) {
+  const headers: Record<string, string> = { "Content-Type": "application/json" }
+  if (etag) {
+    headers["If-None-Match"] = etag
+  }
+  return fetch(`${BACKEND_URL}/generate-readme`, {
+    method: "POST",
+    headers,
+    body: JSON.stringify({ repo_url: repoUrl }),
+  })
+}
+
+function readmeJson(data: any, cacheControl: string) {
+  const headers: Record<string, string> = { "Cache-Control": cacheControl }
+  if (data.key) {
+    headers["ETag"] = `"${data.key}"`
+  }
+  return NextResponse.json(
+    {
+      readme: data.readme,
+      log: data.log || [],
+      decisions: data.decisions || [],
+      thread_id: data.thread_id || null,
+      key: data.key || null,
+    },
+    { headers },
+  )
+}
+
+// GET /api/generate-readme?key=... serves a stored README with immutable
+// caching, so a CDN can answer repeats from the edge.
+export async function GET(request: NextRequest) {
+  const key = request.nextUrl.searchParams.get("key")
+  if (!key) {
+    return NextResponse.json({ error: "key is required" }, { status: 400 })
+  }
+  const etag = `"${key}"`
+  const data = await fetchStoredReadme(key)
+  if (!data) {
+    return NextResponse.json({ error: "README not found" }, { status: 404 })
+  }
+  const ifNoneMatch = request.headers.get("if-none-match") || ""
+  if (ifNoneMatch.split(",").some((tag) => ["*", etag].includes(tag.trim().replace(/^W\//, "")))) {
+    return new NextResponse(null, { status: 304, headers: { ETag: etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL } })
+  }
+  return readmeJson(data, IMMUTABLE_CACHE_CONTROL)
+}
+
 export async function POST(request: NextRequest) {
   try {
     const { repo_url } = await request.json()
@@ -14,24 +90,38 @@ export async function POST(request: NextRequest) {
     console.log(`Processing repository: ${repo_url}`)
 
     try {
-      // Call the FastAPI backend
-      const response = await fetch(`${BACKEND_URL}/generate-readme`, {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
-        body: JSON.stringify({ repo_url }),
-      })
+      // A repo seen moments ago is served by key without asking the backend
+      const known = recentKeys.get(repo_url)
+      if (known && Date.now() - known.checkedAt < KEY_FRESH_MS) {
+        const stored = await fetchStoredReadme(known.key)
+        if (stored) {
+          return readmeJson(stored, "private, no-cache")
+        }
+      }
+
+      // Call the FastAPI backend; If-None-Match makes it answer 412 when the
+      // repo's commit hasn't changed since the README we already have
+      let response = await requestReadme(repo_url, known?.etag)
+
+      if (response.status === 412 && known) {
+        const stored = await fetchStoredReadme(known.key)
+        if (stored) {
+          rememberKey(repo_url, known.key, known.etag)
+          return readmeJson(stored, "private, no-cache")
+        }
+        // The stored copy is gone; have the backend generate it again
+        recentKeys.delete(repo_url)
+        response = await requestReadme(repo_url)
+      }
 
       if (response.ok) {
         const data = await response.json()
         console.log("Successfully received data from backend")
-        return NextResponse.json({
-          readme: data.readme,
-          log: data.log || [],
-          decisions: data.decisions || [],
-          thread_id: data.thread_id || null
-        })
+        const etag = response.headers.get("etag")
+        if (data.key && etag) {
+          rememberKey(repo_url, data.key, etag)
+        }
+        return readmeJson(data, "private, no-cache")
       } else {
         console.error(`Backend returned status ${response.status}`)
         const errorData = await response.json().catch(() => ({ error: "Unknown error" }))
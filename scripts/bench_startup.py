@@ -0,0 +1,108 @@
+"""
+Measure backend cold start.
+
+Reports the slowest imports of `main` (via `python -X importtime`), then
+starts the server and times the first /health response and the moment
+/ready turns 200.
+
+Usage:
+    python scripts/bench_startup.py [--runs 3] [--top 15]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_times(top: int) -> None:
+    """Print total and slowest cumulative import times for main."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line.split(":", 1)[1].split("|")]
+        rows.append((int(cumulative_us), int(self_us), name))
+    main_row = next((row for row in rows if row[2] == "main"), None)
+    if main_row:
+        print(f"import main: {main_row[0] / 1000:.1f} ms cumulative")
+    print(f"slowest {top} imports (cumulative ms, self ms, module):")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:9.1f} {self_us / 1000:8.1f}  {name}")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _status(url: str) -> int:
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except OSError:
+        return 0
+
+
+def startup_once(timeout: float = 60.0):
+    """Start the server once; return seconds to first /health and to /ready."""
+    port = _free_port()
+    env = dict(os.environ, PORT=str(port))
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "main.py"], cwd=ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    health = ready = None
+    try:
+        while time.perf_counter() - started < timeout:
+            if health is None and _status(f"http://127.0.0.1:{port}/health") == 200:
+                health = time.perf_counter() - started
+            if health is not None and _status(f"http://127.0.0.1:{port}/ready") == 200:
+                ready = time.perf_counter() - started
+                break
+            time.sleep(0.02)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return health, ready
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    import_times(args.top)
+
+    health_times, ready_times = [], []
+    for _ in range(args.runs):
+        health, ready = startup_once()
+        if health is not None:
+            health_times.append(health)
+        if ready is not None:
+            ready_times.append(ready)
+    if health_times:
+        print(f"first /health response: median {statistics.median(health_times) * 1000:.0f} ms over {len(health_times)} runs")
+    if ready_times:
+        print(f"/ready turns 200:       median {statistics.median(ready_times) * 1000:.0f} ms over {len(ready_times)} runs")
+    else:
+        print("/ready never turned 200 (check GEMINI_API_KEY and the server log)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Local OpenAI-compatible stub server for testing LLM backends.
+
+Answers POST /v1/chat/completions with a canned response after a
+configurable latency, so hedging, failover and circuit breakers can be
+exercised without a real model. A fraction of requests can be made slow
+(a long tail) or fail with a 500.
+
+Usage:
+    python scripts/stub_llm_server.py [--port 8001] [--latency 0.2] [--slow-rate 0.1] [--slow-latency 5]
+
+Then point the backend at it:
+    CODDOC_LLM_BACKENDS='[{"name": "stub", "kind": "openai", "model": "stub", "base_url": "http://127.0.0.1:8001/v1"}]'
+"""
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(args: argparse.Namespace):
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            if self.path.rstrip('/') != "/v1/chat/completions":
+                self.send_error(404)
+                return
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            slow = random.random() < args.slow_rate
+            time.sleep(args.slow_latency if slow else args.latency)
+            if random.random() < args.failure_rate:
+                self.send_error(500, "simulated failure")
+                return
+            prompt = body.get("messages", [{}])[-1].get("content", "")
+            payload = {
+                "object": "chat.completion",
+                "model": body.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": f"Stub response to a {len(prompt)}-character prompt."},
+                    "finish_reason": "stop",
+                }],
+            }
+            data = json.dumps(payload).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format: str, *log_args) -> None:
+            if args.verbose:
+                super().log_message(format, *log_args)
+
+    return StubHandler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per normal response")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="fraction of responses that are slow")
+    parser.add_argument("--slow-latency", type=float, default=5.0, help="seconds per slow response")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args))
+    print(f"Stub LLM server on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# The backend is run from the repository root rather than installed
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the shared cache out of the working tree; must be set before
+# langgraph_app.tools.shared_cache is imported
+os.environ.setdefault("CODDOC_CACHE_DB", os.path.join(tempfile.mkdtemp(prefix="coddoc-tests-"), "cache.sqlite"))
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import pytest
+
+from langgraph_app.agents.readme_writer import ReadmeWriterAgent
+from langgraph_app.tools.admission import AdmissionController, Overloaded
+from langgraph_app.tools.deadlines import deadline_scope
+from langgraph_app.tools.llm_backends import StubBackend
+from langgraph_app.tools.llm_router import LLMRouter
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queued=1, max_wait=5)
+        controller.service_seconds = 1.5
+        release = asyncio.Event()
+
+        async def hold():
+            async with controller.admit():
+                await release.wait()
+
+        async def queued():
+            async with controller.admit():
+                pass
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(queued())
+        await asyncio.sleep(0)
+        assert (controller.running, controller.waiting) == (1, 1)
+
+        with pytest.raises(Overloaded) as rejected:
+            async with controller.admit():
+                pass
+        release.set()
+        await asyncio.gather(holder, waiter)
+        return controller, rejected.value
+
+    controller, error = asyncio.run(scenario())
+
+    # Two requests ahead, one slot, 1.5s each
+    assert error.retry_after == 3
+    assert controller.rejected == 1
+    assert (controller.running, controller.waiting) == (0, 0)
+
+
+def test_long_estimated_wait_is_rejected_at_once():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1, max_queued=10, max_wait=5)
+        controller.service_seconds = 10
+        release = asyncio.Event()
+
+        async def hold():
+            async with controller.admit():
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        started = time.monotonic()
+        with pytest.raises(Overloaded) as rejected:
+            async with controller.admit():
+                pass
+        elapsed = time.monotonic() - started
+        release.set()
+        await holder
+        return rejected.value, elapsed
+
+    error, elapsed = asyncio.run(scenario())
+
+    assert error.retry_after == 10
+    assert elapsed < 0.1
+
+
+def test_free_slot_admits_even_with_spent_deadline():
+    async def scenario():
+        controller = AdmissionController(max_concurrent=1)
+        async with controller.admit(deadline_seconds=0.001):
+            return controller.running
+
+    assert asyncio.run(scenario()) == 1
+
+
+def test_expired_deadline_degrades_to_fallback_readme():
+    writer = ReadmeWriterAgent(use_llm=False)
+    writer.router = LLMRouter([StubBackend("slow", latency=2.0)], hedging=False)
+    state = {
+        "repo_url": "https://github.com/example/widget",
+        "repo_structure": {"directories": [], "files": ["README.md", "widget.py"]},
+        "dependencies": {"requirements.txt": ["requests"]},
+        "sample_files": {"widget.py": "def main()"},
+    }
+
+    started = time.monotonic()
+    with deadline_scope(0.2):
+        state = writer.process(state)
+
+    assert time.monotonic() - started < 1.0
+    assert state["degraded"]
+    assert state["readme"].startswith("# widget")
+    assert "LLM unavailable" in state["decisions"][-1]["decision"]
@@ -0,0 +1,63 @@
+import asyncio
+import time
+
+import pytest
+
+from langgraph_app.tools import checkpoints, llm_router
+from langgraph_app.tools.llm_backends import StubBackend
+from langgraph_app.tools.llm_router import LLMRouter
+
+langgraph_runner = pytest.importorskip("langgraph_app.langgraph_runner")
+
+
+@pytest.fixture
+def graph_env(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoints, "CHECKPOINT_DB", str(tmp_path / "checkpoints.sqlite"))
+    monkeypatch.setattr(checkpoints, "RUNS_DB", str(tmp_path / "runs.sqlite"))
+    monkeypatch.setattr(llm_router, "_router", LLMRouter([StubBackend("stub", latency=0.05)], hedging=False))
+    repo = tmp_path / "widget"
+    repo.mkdir()
+    (repo / "widget.py").write_text("def main():\n    pass\n")
+    (repo / "requirements.txt").write_text("requests\n")
+    return repo
+
+
+def test_concurrent_runs_do_not_lock_the_registry(graph_env):
+    async def scenario():
+        worst_stall = 0.0
+
+        async def heartbeat():
+            # The event loop must stay responsive while the runs write
+            nonlocal worst_stall
+            while True:
+                started = time.monotonic()
+                await asyncio.sleep(0.01)
+                worst_stall = max(worst_stall, time.monotonic() - started)
+
+        beat = asyncio.create_task(heartbeat())
+        states = [
+            {"repo_url": f"https://github.com/example/widget{i}", "repo_path": str(graph_env)}
+            for i in range(6)
+        ]
+        started = time.monotonic()
+        results = await asyncio.gather(*(langgraph_runner.run_langgraph(state) for state in states))
+        elapsed = time.monotonic() - started
+        beat.cancel()
+        return results, elapsed, worst_stall
+
+    results, elapsed, worst_stall = asyncio.run(scenario())
+
+    assert all(result["readme"] for result in results)
+    assert all(checkpoints.get_run(result["thread_id"])["status"] == "completed" for result in results)
+    assert elapsed < 15
+    assert worst_stall < 1.0
+
+
+def test_thread_of_another_repository_is_rejected(graph_env):
+    state = {"repo_url": "https://github.com/example/widget", "repo_path": str(graph_env)}
+    result = asyncio.run(langgraph_runner.run_langgraph(state))
+
+    other = {"repo_url": "https://github.com/example/other", "repo_path": str(graph_env)}
+    with pytest.raises(checkpoints.ThreadConflict):
+        asyncio.run(langgraph_runner.run_langgraph(other, thread_id=result["thread_id"]))
+    assert checkpoints.get_run(result["thread_id"])["repo_url"] == state["repo_url"]
@@ -0,0 +1,82 @@
+import pytest
+
+from langgraph_app.tools import file_sampler
+from langgraph_app.tools.file_sampler import classify_prefix, read_sample
+
+
+@pytest.fixture(params=[False, True], ids=["read", "mmap"])
+def write(tmp_path, request, monkeypatch):
+    if request.param:
+        monkeypatch.setattr(file_sampler, "MMAP_THRESHOLD", 0)
+
+    def write(text: str, name: str = "sample.py") -> str:
+        path = tmp_path / name
+        path.write_text(text)
+        return str(path)
+
+    return write
+
+
+def test_short_file_is_returned_whole(tmp_path):
+    path = tmp_path / "short.py"
+    path.write_text("def main():\n    pass\n")
+    assert read_sample(str(path)) == "def main():\n    pass\n"
+
+
+def test_signatures_right_after_the_head_are_kept(write):
+    text = "# " + "x" * 997 + "\n" + "def right_after_head():\n    pass\n" + "y = 1\n" * 2000
+    sample = read_sample(write(text), head_chars=1000, max_signatures=5)
+
+    head, _, signatures = sample.partition("... signatures:\n")
+    assert len(head) < 1100
+    assert signatures.splitlines() == ["def right_after_head():"]
+
+
+def test_line_cut_by_the_head_is_not_a_signature(write):
+    text = "# " + "x" * 990 + "\ndef cut_by_head():\n    pass\ndef next_one():\n    pass\n" + "y = 1\n" * 2000
+    sample = read_sample(write(text), head_chars=1000, max_signatures=5)
+
+    assert sample.partition("... signatures:\n")[2].splitlines() == ["def next_one():"]
+
+
+def test_tail_is_kept_separately(write):
+    text = "a = 1\n" * 1000 + "class Middle:\n    pass\n" + "b = 2\n" * 1000 + "def last():\n    pass\n"
+    sample = read_sample(write(text), head_chars=100, tail_chars=30, max_signatures=5)
+
+    assert "class Middle:" in sample
+    assert sample.endswith("def last():\n    pass\n")
+
+
+def test_binary_minified_and_oversized_files_are_skipped(write, tmp_path):
+    binary = tmp_path / "blob.bin"
+    binary.write_bytes(b"\x00\x01\x02" * 100)
+    assert read_sample(str(binary)) is None
+    assert read_sample(write("var a=1;" * 500, "app.min.js")) is None
+    assert read_sample(write("x = 1\n" * 100), max_file_bytes=10) is None
+
+
+def test_classify_prefix():
+    assert classify_prefix(b"def main():\n    pass\n") is None
+    assert classify_prefix(b"\x00ELF") == "binary"
+    assert classify_prefix(b"\xff\xfe\xfd") == "binary"
+    assert classify_prefix(b"x" * 3000) == "minified"
+    # A multi-byte character cut at the end of the prefix is still text
+    assert classify_prefix("café".encode()[:-1]) is None
+
+
+@pytest.mark.parametrize("banner", [
+    b"// Code generated by protoc-gen-go. DO NOT EDIT.\n",
+    b"# Code generated by sqlc. DO NOT EDIT.\n",
+    b"/**\n * @generated by the schema compiler\n */\n",
+])
+def test_generated_banners(banner):
+    assert classify_prefix(banner + b"package api\n") == "generated"
+
+
+@pytest.mark.parametrize("text", [
+    b"# Do not edit this list by hand unless you know what you are doing\ndef f():\n    pass\n",
+    b'"""Helpers for autogenerated IDs."""\nimport uuid\n',
+    b"import os\n" * 10 + b"# @generated files are skipped by the scanner\n",
+])
+def test_ordinary_comments_are_not_generated_markers(text):
+    assert classify_prefix(text) is None
@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+from langgraph_app.tools import llm_router
+from langgraph_app.tools.deadlines import deadline_scope
+from langgraph_app.tools.llm_backends import StubBackend
+from langgraph_app.tools.llm_router import CircuitBreaker, LLMRouter, LLMUnavailable
+
+
+def warm(router: LLMRouter, name: str, seconds: float, samples: int = llm_router.MIN_LATENCY_SAMPLES) -> None:
+    for _ in range(samples):
+        router.latencies[name].add(seconds)
+
+
+def test_hedge_fires_after_p95(monkeypatch):
+    monkeypatch.setattr(llm_router, "HEDGE_MIN_DELAY_SECONDS", 0.01)
+    router = LLMRouter([StubBackend("slow", latency=1.0), StubBackend("fast")])
+    warm(router, "slow", 0.05)
+    assert router.hedge_delay("slow") == pytest.approx(0.05)
+
+    started = time.monotonic()
+    result = router.generate("prompt")
+
+    assert result.hedged
+    assert result.backend == "fast"
+    assert time.monotonic() - started < 0.5
+
+
+def test_no_hedge_when_faster_than_p95(monkeypatch):
+    monkeypatch.setattr(llm_router, "HEDGE_MIN_DELAY_SECONDS", 0.01)
+    router = LLMRouter([StubBackend("main", latency=0.01), StubBackend("backup")])
+    warm(router, "main", 0.5)
+
+    result = router.generate("prompt")
+
+    assert not result.hedged
+    assert result.backend == "main"
+
+
+def test_failover_to_next_backend():
+    router = LLMRouter([StubBackend("broken", failure_rate=1.0), StubBackend("healthy")], hedging=False)
+
+    assert router.generate("prompt").backend == "healthy"
+
+
+def test_breaker_half_opens_for_one_trial():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0.05)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    # Only one trial request at a time
+    assert not breaker.allow()
+
+    # A failed trial re-opens it for another cool-down
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_open_breaker_skips_backend():
+    router = LLMRouter([StubBackend("broken", failure_rate=1.0), StubBackend("healthy")], hedging=False)
+    threshold = router.breakers["broken"].failure_threshold
+    for _ in range(threshold):
+        router.generate("prompt")
+    assert router.breakers["broken"].state == "open"
+
+    router.backends["broken"].failure_rate = 0.0
+    assert router.generate("prompt").backend == "healthy"
+
+
+def test_deadline_timeouts_do_not_open_breaker():
+    router = LLMRouter([StubBackend("main", latency=0.3)], hedging=False)
+    for _ in range(router.breakers["main"].failure_threshold + 1):
+        with deadline_scope(0.05):
+            with pytest.raises(LLMUnavailable):
+                router.generate("prompt")
+    # Let the abandoned calls time out in the background
+    time.sleep(0.1)
+
+    assert router.breakers["main"].state == "closed"
+    assert router.generate("prompt").backend == "main"
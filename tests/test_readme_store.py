@@ -0,0 +1,38 @@
+from langgraph_app.tools.readme_store import etag_for, etag_matches, get_readme, put_readme, readme_key
+
+SHA = "0123456789abcdef0123456789abcdef01234567"
+
+
+def test_key_ignores_url_spelling():
+    key = readme_key("https://github.com/Owner/Repo", SHA, "auto")
+
+    assert readme_key("https://github.com/owner/repo.git/", SHA, "auto") == key
+
+
+def test_key_changes_with_commit_and_mode():
+    key = readme_key("https://github.com/owner/repo", SHA, "auto")
+
+    assert readme_key("https://github.com/owner/repo", "f" * 40, "auto") != key
+    assert readme_key("https://github.com/owner/repo", SHA, "fast") != key
+
+
+def test_etag_comparison_is_weak_and_accepts_lists():
+    etag = etag_for("abc")
+
+    assert etag_matches('"abc"', etag, stored=True)
+    assert etag_matches('W/"abc"', etag, stored=True)
+    assert etag_matches('"other", "abc"', etag, stored=True)
+    assert not etag_matches('"other"', etag, stored=True)
+    assert not etag_matches(None, etag, stored=True)
+
+
+def test_star_matches_only_a_stored_copy():
+    key = readme_key("https://github.com/owner/star", SHA, "auto")
+    assert not etag_matches("*", etag_for(key), get_readme(key) is not None)
+
+    put_readme(key, {"readme": "# Star", "key": key})
+    assert etag_matches("*", etag_for(key), get_readme(key) is not None)
+
+
+def test_nothing_matches_a_missing_copy():
+    assert not etag_matches('"abc"', etag_for("abc"), stored=False)
@@ -0,0 +1,41 @@
+from langgraph_app.tools import routing
+from langgraph_app.tools.routing import plan_route, size_tier
+
+
+def scanned(files=10, extensions=None, manifests=("pyproject.toml",), outline_chars=2000):
+    return {
+        "repo_structure": {"directories": ["src"]},
+        "dependencies": {},
+        "scan_stats": {
+            "files": files,
+            "extensions": extensions or {".py": files},
+            "manifests": list(manifests),
+            "outline_chars": outline_chars,
+        },
+    }
+
+
+def test_size_tiers():
+    assert size_tier(files=10, languages=1, manifests=1, prompt_tokens=500) == "small"
+    assert size_tier(files=10, languages=3, manifests=1, prompt_tokens=500) == "medium"
+    assert size_tier(files=200, languages=1, manifests=1, prompt_tokens=500) == "medium"
+    assert size_tier(files=10, languages=1, manifests=1, prompt_tokens=routing.LARGE_MIN_PROMPT_TOKENS) == "large"
+    assert size_tier(files=routing.LARGE_MIN_FILES, languages=1, manifests=1, prompt_tokens=500) == "large"
+    assert size_tier(files=10, languages=1, manifests=routing.LARGE_MIN_MANIFESTS, prompt_tokens=500) == "large"
+
+
+def test_tier_picks_pipeline_backends_and_settings():
+    route = plan_route(scanned(), lambda tier: [f"{tier}-model"])
+    assert (route["tier"], route["pipeline"], route["backends"]) == ("small", "single-shot", ["small-model"])
+    assert route["max_output_tokens"] == routing.ROUTE_TIERS["small"]["max_output_tokens"]
+
+    large = plan_route(scanned(outline_chars=4 * routing.LARGE_MIN_PROMPT_TOKENS), lambda tier: ["main"])
+    assert (large["tier"], large["pipeline"]) == ("large", "map-reduce")
+    assert large["map_output_tokens"] == routing.ROUTE_TIERS["large"]["map_output_tokens"]
+
+
+def test_forced_pipeline_keeps_the_tier_settings():
+    route = plan_route(scanned(files=300), lambda tier: ["main"], pipeline="sequential")
+
+    assert (route["tier"], route["pipeline"]) == ("medium", "sequential")
+    assert route["temperature"] == routing.ROUTE_TIERS["medium"]["temperature"]
@@ -0,0 +1,116 @@
+from langgraph_app.agents.repo_analyzer import RepoAnalyzerAgent
+from langgraph_app.tools.symbol_index import extract_python, extract_with_regex, outline_entries, truncate_outline
+
+PYTHON_APP = '''"""Inventory service."""
+import argparse
+from flask import Flask
+
+app = Flask(__name__)
+
+
+class Store:
+    def load(self):
+        pass
+
+    def _private(self):
+        pass
+
+
+@app.route("/items")
+def list_items():
+    pass
+
+
+@app.route("/items", methods=["POST", "put"])
+def save_item():
+    pass
+
+
+@router.delete("/items/{item_id}")
+async def delete_item(item_id):
+    pass
+
+
+def _helper():
+    pass
+
+
+if __name__ == "__main__":
+    argparse.ArgumentParser()
+'''
+
+
+def test_python_symbols_routes_and_entry_point():
+    entry = extract_python(PYTHON_APP)
+
+    assert entry["doc"] == "Inventory service."
+    assert entry["classes"] == [{"name": "Store", "methods": ["load"]}]
+    assert entry["functions"] == ["list_items", "save_item", "delete_item"]
+    assert entry["routes"] == ["GET /items", "POST /items", "PUT /items", "DELETE /items/{item_id}"]
+    assert entry["main"] and entry["cli"] == ["argparse"]
+
+
+def test_python_that_does_not_parse_gives_an_empty_entry():
+    assert extract_python("def broken(:\n")["functions"] == []
+
+
+def test_regex_extractors():
+    js = extract_with_regex(
+        "export class Server {}\nexport async function start() {}\n"
+        "app.get('/health', ok)\nrouter.use('/api', api)\napp.listen(3000)\n",
+        "javascript",
+    )
+    assert js["classes"] == [{"name": "Server", "methods": []}]
+    assert js["functions"] == ["start"]
+    assert js["routes"] == ["GET /health", "ANY /api"]
+    assert js["main"]
+
+    go = extract_with_regex(
+        'package main\n\ntype Config struct {}\n\nfunc Load() {}\n\n'
+        'func main() {\n\thttp.HandleFunc("/ping", ping)\n\tr.POST("/items", add)\n}\n',
+        "go",
+    )
+    assert go["classes"] == [{"name": "Config", "methods": []}]
+    assert go["functions"] == ["Load"]
+    assert go["routes"] == ["ANY /ping", "POST /items"]
+    assert go["main"]
+
+
+def entry(functions=(), routes=(), main=False):
+    return {"language": "Python", "classes": [], "functions": list(functions), "routes": list(routes),
+            "cli": [], "main": main, "doc": ""}
+
+
+INDEX = {
+    "pkg/deep/util.py": entry(functions=["helper"]),
+    "app.py": entry(routes=["GET /items"], main=True),
+    "pkg/models.py": entry(functions=["load", "save", "delete"]),
+    "pkg/empty.py": entry(),
+}
+
+
+def test_outline_puts_entry_points_first_and_skips_empty_files():
+    outline = outline_entries(INDEX)
+
+    assert list(outline) == ["app.py", "pkg/models.py", "pkg/deep/util.py"]
+    assert outline["app.py"] == "entry point; routes: GET /items"
+
+
+def test_outline_stops_at_the_budget():
+    budget = len("app.py") + len(outline_entries(INDEX)["app.py"]) + 2
+
+    assert list(outline_entries(INDEX, max_chars=budget)) == ["app.py"]
+
+
+def test_truncated_outline_matches_a_smaller_budget():
+    full = outline_entries(INDEX)
+    for budget in range(0, 200, 7):
+        assert truncate_outline(full, budget) == outline_entries(INDEX, max_chars=budget)
+
+
+def test_outline_chunks_come_from_the_scanned_outline():
+    state = {"repo_path": "/does/not/exist", "outline": outline_entries(INDEX)}
+    chunks = RepoAnalyzerAgent(use_llm=False).outline_chunks(state, chunk_chars=60)
+
+    assert [path for chunk in chunks for path in chunk] == ["app.py", "pkg/models.py", "pkg/deep/util.py"]
+    assert len(chunks) > 1
@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from langgraph_app.tools import workspace
+from langgraph_app.tools.workspace import WorkspaceManager, WorkspaceQuotaExceeded
+
+
+@pytest.fixture
+def roots(tmp_path, monkeypatch):
+    monkeypatch.setattr(workspace, "MIRROR_ROOT", str(tmp_path / "mirrors"))
+    monkeypatch.setattr(workspace, "USAGE_CACHE_SECONDS", 0)
+    os.makedirs(workspace.MIRROR_ROOT)
+    return str(tmp_path / "workspaces")
+
+
+def fill(path: str, size: int) -> None:
+    with open(os.path.join(path, "blob"), "wb") as f:
+        f.write(b"x" * size)
+
+
+def test_quota_counts_other_workers_workspaces_and_mirrors(roots):
+    # Two managers on one root stand in for two worker processes
+    first = WorkspaceManager(root=roots, max_total_bytes=10_000)
+    second = WorkspaceManager(root=roots, max_total_bytes=10_000)
+    fill(first.allocate(), 6_000)
+    mirror = os.path.join(workspace.MIRROR_ROOT, "abc.git")
+    os.makedirs(mirror)
+    fill(mirror, 2_000)
+
+    assert second.total_usage() == 8_000
+
+    # Evicting the idle mirror doesn't free enough
+    fill(second.allocate(), 4_500)
+    with pytest.raises(WorkspaceQuotaExceeded):
+        second.allocate()
+    assert not os.path.exists(mirror)
+
+
+def test_idle_mirrors_are_evicted_when_quota_runs_out(roots):
+    manager = WorkspaceManager(root=roots, max_total_bytes=5_000)
+    mirror = os.path.join(workspace.MIRROR_ROOT, "abc.git")
+    os.makedirs(mirror)
+    fill(mirror, 6_000)
+
+    path = manager.allocate()
+
+    assert os.path.isdir(path)
+    assert not os.path.exists(mirror)
+    assert manager.total_usage() == 0